@@ -4,18 +4,52 @@ Gear Module for NakedMud
 Provides item types and functionality for weapons, armor, and other equipment.
 Includes wielded items (weapons, tools) and equipped items (armor, accessories).
 """
-import os
 import importlib
-import re
+import time
+import mudsys
+
+# Submodules imported at package load, in order. Each one registers its item
+# types, commands and hooks when imported. Once they are all in, worn types
+# are registered with C from the config's compiled sidecar; the config file
+# itself is not parsed until it is first used.
+MODULES = (
+    "gear_config",
+    "wielded",
+    "equipped",
+    "gear_registry",
+    "gear_wear",
+    "gear_olc",
+    "gear_config_olc",
+)
+
+# Diagnostic modules, kept off the boot path and imported the first time
+# one of their admin commands runs: command -> (module, command function)
+COMMAND_MODULES = {
+    "gearbench": ("gear_bench", "cmd_gearbench"),
+    "gearstats": ("gear_stats", "cmd_gearstats"),
+}
+
+_import_times = []
+for _module_name in MODULES:
+    _start = time.perf_counter()
+    importlib.import_module('.' + _module_name, package=__name__)
+    _import_times.append(("import " + _module_name, time.perf_counter() - _start))
 
-# Import all submodules to make them available
 from . import gear_config
+gear_config.register_boot_worn_types()
 
-# Import all submodules to register item types and hooks
-for fl in os.listdir(__path__[0]):
-    if fl.endswith(".py") and not (fl == "__init__.py" or fl.startswith(".")):
-        module_name = fl[:-3]
-        importlib.import_module('.' + module_name, package=__name__)
+def _deferred_cmd(module_name, func_name):
+    """Command that imports module_name on first use, then runs func_name"""
+    def run_cmd(ch, cmd, arg):
+        module = importlib.import_module('.' + module_name, package=__name__)
+        return getattr(module, func_name)(ch, cmd, arg)
+    return run_cmd
+
+for _cmd_name, (_module_name, _func_name) in COMMAND_MODULES.items():
+    mudsys.add_cmd(_cmd_name, None, _deferred_cmd(_module_name, _func_name), "admin", False)
+from .dice import DiceExpression, DiceRoller, parse_dice, parse_dice_or_default, DEFAULT_DICE
+from .gear_registry import get_gear_registry
+from .gear_wear import queue_wear, queue_hit_wear, queue_block_wear, get_condition_changes
 
 # Define what gets imported with "from gear import *"
 __all__ = [
@@ -27,11 +61,34 @@ __all__ = [
     'get_bodypart_ac',
     'get_weapon_damage_all',
     'get_weapon_damage',
+    'roll_weapon_damage',
     'get_weapon_properties',
+    'get_weapon_property_set',
     'get_weapon_stats',
-    'get_armor_stats'
+    'get_armor_stats',
+    'get_import_report',
+    # Dice expressions
+    'DiceExpression',
+    'DiceRoller',
+    'parse_dice',
+    # Columnar registry of in-game gear
+    'get_gear_registry',
+    # Durability wear
+    'queue_wear',
+    'queue_hit_wear',
+    'queue_block_wear',
+    'get_condition_changes',
 ]
 
+def get_import_report():
+    """Get a breakdown of gear module boot time
+    
+    Returns a list of (stage, seconds) tuples: one per submodule import,
+    followed by the boot worn type registration and, once the config has
+    been used, its deferred load.
+    """
+    return list(_import_times) + gear_config.get_init_times()
+
 # ============================================================================
 # GEAR MODULE HELPER FUNCTIONS
 # ============================================================================
@@ -95,16 +152,8 @@ def get_bodypart_ac(ch, bodypart):
 
 def _parse_dice_string(dice_str):
     """Parse dice string like '1d6' or '3d8' into (count, sides)"""
-    if not dice_str or 'd' not in dice_str:
-        return (1, 4)  # Default to 1d4
-    
-    try:
-        parts = dice_str.lower().split('d')
-        count = int(parts[0]) if parts[0] else 1
-        sides = int(parts[1]) if len(parts) > 1 else 4
-        return (count, sides)
-    except (ValueError, IndexError):
-        return (1, 4)  # Default to 1d4 on parse error
+    dice = parse_dice_or_default(dice_str)
+    return (dice.count, dice.sides)
 
 def _dice_to_string(count, sides):
     """Convert dice count and sides back to string format"""
@@ -112,9 +161,18 @@ def _dice_to_string(count, sides):
 
 def _upgrade_dice(dice_str, bonus_dice=0):
     """Upgrade dice by adding to the die size (for dual-wield bonus)"""
-    count, sides = _parse_dice_string(dice_str)
-    new_sides = min(sides + (bonus_dice * 2), 20)  # Cap at d20
-    return _dice_to_string(count, new_sides)
+    return str(parse_dice_or_default(dice_str).upgraded(bonus_dice))
+
+def _weapon_damage(data, dual_wield=False):
+    """Full damage expression of a weapon, with its damage bonus folded in
+    
+    Dual wielding a weapon in both hands adds 2 to its die size (max d20).
+    As before, only a positive damage_bonus is added.
+    """
+    dice = parse_dice_or_default(data.damage_dice)
+    if dual_wield:
+        dice = dice.upgraded(1)
+    return dice.plus(data.damage_bonus) if data.damage_bonus > 0 else dice
 
 def get_weapon_damage_all(ch):
     """Get all weapon damage with locations
@@ -146,17 +204,11 @@ def get_weapon_damage_all(ch):
     for obj, location in wielded_items:
         data = get_wielded_data(obj)
         if data:
-            dice = data.damage_dice
-            bonus = data.damage_bonus
-            
             # Apply dual-wield bonus if using both hands for same weapon
             if is_dual_wielding and 'right hand' in location.lower() and 'left hand' in location.lower():
-                dice = _upgrade_dice(dice, 1)  # +2 to die size for dual-wield
-                full_damage = f"{dice}+{bonus}" if bonus > 0 else dice
-                damages.append(('both hands', full_damage))
+                damages.append(('both hands', str(_weapon_damage(data, True))))
             else:
-                full_damage = f"{dice}+{bonus}" if bonus > 0 else dice
-                damages.append((location, full_damage))
+                damages.append((location, str(_weapon_damage(data))))
     
     # Add unarmed damage for empty primary hand
     if not has_primary and not is_dual_wielding:
@@ -173,6 +225,12 @@ def get_weapon_damage(ch, hand='primary'):
     
     Returns: damage string like '1d8+2' or '1d4+0' for unarmed
     """
+    dice = _weapon_dice(ch, hand)
+    # Return unarmed damage if no weapon found
+    return str(dice) if dice is not None else '1d4+0'
+
+def _weapon_dice(ch, hand='primary'):
+    """DiceExpression for the weapon in hand, or None if that hand is empty"""
     target_hand = 'right hand' if hand == 'primary' else 'left hand'
     
     for obj in ch.eq:
@@ -183,30 +241,38 @@ def get_weapon_damage(ch, hand='primary'):
             if 'right hand' in location.lower() and 'left hand' in location.lower():
                 data = get_wielded_data(obj)
                 if data:
-                    dice = _upgrade_dice(data.damage_dice, 1)  # +2 die size for dual-wield
-                    bonus = data.damage_bonus
-                    return f"{dice}+{bonus}" if bonus > 0 else dice
+                    return _weapon_damage(data, True)  # +2 die size for dual-wield
             
             # Check for specific hand
             elif target_hand in location.lower():
                 data = get_wielded_data(obj)
                 if data:
-                    dice = data.damage_dice
-                    bonus = data.damage_bonus
-                    return f"{dice}+{bonus}" if bonus > 0 else dice
+                    return _weapon_damage(data)
     
-    # Return unarmed damage if no weapon found
-    return '1d4+0'
+    return None
 
-def get_weapon_properties(ch, hand='primary'):
-    """Get weapon special properties for specific hand
+def roll_weapon_damage(chars, hand='primary', roller=None):
+    """Roll weapon damage for many characters in one batch
     
     Args:
-        ch: Character object  
+        chars: Character objects, e.g. everyone fighting in a room
         hand: 'primary' (right hand) or 'offhand' (left hand)
+        roller: dice.DiceRoller to use, e.g. DiceRoller(seed) for repeatable
+                results; a fresh unseeded one by default
     
-    Returns: string of comma-separated properties or empty string
+    Returns: list of damage totals in the same order as chars, using the
+    same dice as get_weapon_damage() (1d4 unarmed)
     """
+    if roller is None:
+        roller = DiceRoller()
+    triples = []
+    for ch in chars:
+        dice = _weapon_dice(ch, hand)
+        triples.append((dice if dice is not None else DEFAULT_DICE).as_triple())
+    return roller.roll_many(triples)
+
+def _wielded_data_for_hand(ch, hand):
+    """Get wielded data of the weapon in hand (or in both hands), or None"""
     target_hand = 'right hand' if hand == 'primary' else 'left hand'
     
     for obj in ch.eq:
@@ -218,9 +284,34 @@ def get_weapon_properties(ch, hand='primary'):
                 ('right hand' in location.lower() and 'left hand' in location.lower())):
                 data = get_wielded_data(obj)
                 if data:
-                    return data.special_properties
+                    return data
+    
+    return None
+
+def get_weapon_properties(ch, hand='primary'):
+    """Get weapon special properties for specific hand
+    
+    Args:
+        ch: Character object  
+        hand: 'primary' (right hand) or 'offhand' (left hand)
     
-    return ""
+    Returns: string of comma-separated properties or empty string
+    """
+    data = _wielded_data_for_hand(ch, hand)
+    return data.special_properties if data else ""
+
+def get_weapon_property_set(ch, hand='primary'):
+    """Get weapon special properties for specific hand as a frozenset
+    
+    Args:
+        ch: Character object
+        hand: 'primary' (right hand) or 'offhand' (left hand)
+    
+    Returns: frozenset of lowercased property names, already parsed on the
+    item, e.g. 'versatile' in get_weapon_property_set(ch)
+    """
+    data = _wielded_data_for_hand(ch, hand)
+    return data.property_set if data else frozenset()
 
 def get_weapon_stats(ch, hand='primary'):
     """Get complete weapon statistics for specific hand
@@ -252,10 +343,8 @@ def get_weapon_stats(ch, hand='primary'):
             if 'right hand' in location.lower() and 'left hand' in location.lower():
                 data = get_wielded_data(obj)
                 if data:
-                    dice = _upgrade_dice(data.damage_dice, 1)  # +2 die size for dual-wield
-                    bonus = data.damage_bonus
                     stats.update({
-                        'damage': f"{dice}+{bonus}" if bonus > 0 else dice,
+                        'damage': str(_weapon_damage(data, True)),  # +2 die size for dual-wield
                         'hit_bonus': data.hit_bonus,
                         'speed': data.weapon_speed,
                         'reach': data.reach,
@@ -269,10 +358,8 @@ def get_weapon_stats(ch, hand='primary'):
             elif target_hand in location.lower():
                 data = get_wielded_data(obj)
                 if data:
-                    dice = data.damage_dice
-                    bonus = data.damage_bonus
                     stats.update({
-                        'damage': f"{dice}+{bonus}" if bonus > 0 else dice,
+                        'damage': str(_weapon_damage(data)),
                         'hit_bonus': data.hit_bonus,
                         'speed': data.weapon_speed,
                         'reach': data.reach,
@@ -0,0 +1,186 @@
+"""
+dice.py
+
+Dice expressions for weapon damage, e.g. "1d6", "2d4+1", "d8-1" or a flat
+"3". parse_dice() compiles a string once and caches the result, so the
+same damage_dice string on many weapons is only ever parsed one time.
+
+DiceRoller rolls whole batches of expressions at once, vectorized with
+NumPy when it is installed and with the random module otherwise.
+"""
+import functools
+import random
+import re
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Limits on a single expression, to keep rolls and OLC input sane
+MAX_DICE_COUNT = 100
+MAX_DICE_SIDES = 1000
+
+_DICE_RE = re.compile(r"^(\d*)d(\d+)((?:[+-]\d+)*)$")
+_MODIFIER_RE = re.compile(r"[+-]\d+")
+
+class DiceExpression:
+    """A compiled 'NdS+M' dice expression
+    
+    count dice with sides faces each, plus a flat modifier. A flat damage
+    value like "3" has count and sides of 0. Instances are immutable and
+    shared through the parse_dice() cache.
+    """
+    __slots__ = ("count", "sides", "modifier", "_min", "_max", "_mean", "_faces")
+    
+    def __init__(self, count, sides, modifier=0):
+        self.count = count
+        self.sides = sides
+        self.modifier = modifier
+        self._min = (count if sides else 0) + modifier
+        self._max = count * sides + modifier
+        self._mean = count * (sides + 1) / 2.0 + modifier if sides else float(modifier)
+        self._faces = range(1, sides + 1)
+    
+    def roll(self, rng=random):
+        """Roll the expression, using rng (the random module by default)"""
+        if not self.count or not self.sides:
+            return self.modifier
+        if self.count == 1:
+            return rng.randint(1, self.sides) + self.modifier
+        return sum(rng.choices(self._faces, k=self.count)) + self.modifier
+    
+    def min(self):
+        """Lowest possible roll"""
+        return self._min
+    
+    def max(self):
+        """Highest possible roll"""
+        return self._max
+    
+    def mean(self):
+        """Average roll"""
+        return self._mean
+    
+    def as_triple(self):
+        """(count, sides, modifier), the form DiceRoller.roll_many() takes"""
+        return (self.count, self.sides, self.modifier)
+    
+    def plus(self, bonus):
+        """Return this expression with bonus added to the modifier"""
+        if not bonus:
+            return self
+        return _compiled(self.count, self.sides, self.modifier + bonus)
+    
+    def upgraded(self, bonus_dice=1, cap=20):
+        """Return this expression with 2 faces per bonus_dice, capped at cap sides"""
+        if not self.sides:
+            return self
+        return _compiled(self.count, min(self.sides + bonus_dice * 2, cap), self.modifier)
+    
+    def __str__(self):
+        if not self.sides:
+            return str(self.modifier)
+        text = "%dd%d" % (self.count, self.sides)
+        if self.modifier > 0:
+            text += "+%d" % self.modifier
+        elif self.modifier < 0:
+            text += "%d" % self.modifier
+        return text
+    
+    def __repr__(self):
+        return "DiceExpression(%r)" % str(self)
+    
+    def __eq__(self, other):
+        if not isinstance(other, DiceExpression):
+            return NotImplemented
+        return (self.count, self.sides, self.modifier) == (other.count, other.sides, other.modifier)
+    
+    def __hash__(self):
+        return hash((self.count, self.sides, self.modifier))
+
+@functools.lru_cache(maxsize=1024)
+def _compiled(count, sides, modifier):
+    return DiceExpression(count, sides, modifier)
+
+@functools.lru_cache(maxsize=4096)
+def parse_dice(text):
+    """Compile a dice string into a shared DiceExpression
+    
+    Accepts 'NdS' with optional count and any number of +M/-M modifiers,
+    or a flat integer. Case and spaces are ignored. Raises ValueError for
+    anything else, including counts or sides over the limits above.
+    """
+    spec = text.replace(" ", "").lower()
+    if spec.lstrip("+-").isdigit():
+        return _compiled(0, 0, int(spec))
+    match = _DICE_RE.match(spec)
+    if not match:
+        raise ValueError("invalid dice expression: %r" % text)
+    count = int(match.group(1)) if match.group(1) else 1
+    sides = int(match.group(2))
+    if not 1 <= count <= MAX_DICE_COUNT or not 1 <= sides <= MAX_DICE_SIDES:
+        raise ValueError("dice out of range: %r" % text)
+    modifier = sum(int(m) for m in _MODIFIER_RE.findall(match.group(3)))
+    return _compiled(count, sides, modifier)
+
+# Unarmed damage, and the fallback for unparseable damage_dice
+DEFAULT_DICE = parse_dice("1d4")
+
+def parse_dice_or_default(text, default=DEFAULT_DICE):
+    """parse_dice(), returning default instead of raising"""
+    try:
+        return parse_dice(text)
+    except (ValueError, AttributeError):
+        return default
+
+class DiceRoller:
+    """Rolls batches of dice with its own, optionally seeded, RNG
+    
+    roll_many() takes (count, sides, bonus) triples and returns one total
+    per triple. With NumPy every die in the batch is drawn in a single
+    vectorized call; without it the batch is rolled in a Python loop. A
+    seed makes results reproducible for a given backend, but NumPy and the
+    fallback produce different sequences for the same seed.
+    """
+    def __init__(self, seed=None, use_numpy=True):
+        self.seed = seed
+        self.vectorized = use_numpy and numpy is not None
+        if self.vectorized:
+            self.rng = numpy.random.default_rng(seed)
+        else:
+            self.rng = random.Random(seed)
+    
+    def roll(self, dice):
+        """Roll one DiceExpression or dice string"""
+        if not isinstance(dice, DiceExpression):
+            dice = parse_dice(dice)
+        return self.roll_many((dice.as_triple(),))[0]
+    
+    def roll_many(self, triples):
+        """Roll every (count, sides, bonus) triple, returns a list of totals"""
+        if self.vectorized:
+            return self._roll_numpy(triples)
+        rand = self.rng.random
+        totals = []
+        for count, sides, bonus in triples:
+            if sides:
+                for _ in range(count):
+                    bonus += int(rand() * sides) + 1
+            totals.append(bonus)
+        return totals
+    
+    def _roll_numpy(self, triples):
+        table = numpy.array(triples, dtype=numpy.int64).reshape(-1, 3)
+        counts = numpy.where(table[:, 1] > 0, table[:, 0], 0)
+        # One draw per die: each die knows its sides and which triple owns it
+        owners = numpy.repeat(numpy.arange(len(table)), counts)
+        faces = self.rng.integers(1, table[owners, 1] + 1)
+        totals = numpy.bincount(owners, weights=faces, minlength=len(table))
+        return (totals.astype(numpy.int64) + table[:, 2]).tolist()
+    
+    def roll_expressions(self, expressions):
+        """Roll many DiceExpressions or dice strings, returns a list of totals"""
+        return self.roll_many([
+            (dice if isinstance(dice, DiceExpression) else parse_dice(dice)).as_triple()
+            for dice in expressions])
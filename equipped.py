@@ -5,67 +5,72 @@ Python item subtype for equipped gear (armor, accessories, etc.)
 Provides data storage and functionality for equipment items.
 """
 import mudsys, storage, hooks
+from . import gear_config
+from .gear_data import GearField, gear_fields, copy_values, load_fields, store_fields
+from .gear_data import config_choice, config_list, condition_suffix
 
+# Schema of every stored field, in storage order
+EQUIPPED_FIELDS = (
+    GearField("armor_class", "Int", 0, range=(0, 50)),
+    GearField("enchantment_level", "Int", 0, range=(-10, 10)),
+    GearField("durability", "Int", 100, range=(0, "max_durability")),
+    GearField("max_durability", "Int", 100, range=(1, 1000)),
+    GearField("material", "String", "",
+              validator=config_choice(gear_config.is_valid_equipped_material,
+                                      gear_config.get_equipped_materials,
+                                      "Invalid material. Valid materials are: %s", "wielded")),
+    GearField("special_properties", "String", "",
+              validator=config_list(gear_config.is_valid_equipped_special_property,
+                                    gear_config.get_equipped_special_properties,
+                                    "Invalid properties: %s\nValid properties are: %s")),
+    GearField("worn_type", "String", "",
+              validator=config_choice(gear_config.worn_type_exists, gear_config.get_worn_types,
+                                      "Invalid worn type. Valid worn types are: %s")),
+)
+
+@gear_fields(EQUIPPED_FIELDS,
+             interned=("material", "worn_type"),
+             parsed={"special_properties": "property_set"})
 class EquippedData:
     """
     Data class for equipped items.
     Stores equipment-specific information like armor class, enchantments, etc.
+    
+    Field values are a copy-on-write tuple shared with the class defaults
+    or with the data this was copied from, and move into a slot per field
+    on the first write or a load; see gear_data.gear_fields(). String
+    fields are interned on write, and property_set is a frozenset of
+    special_properties kept in step with the string.
     """
     __item_type__ = "equipped"
+    __slots__ = ("_values", "_source")
     
     def __init__(self, set_data=None):
         """Initialize equipped data, optionally from storage set"""
-        self.armor_class = 0
-        self.enchantment_level = 0
-        self.durability = 100
-        self.max_durability = 100
-        self.material = ""
-        self.special_properties = ""
-        self.worn_type = ""
+        self._values = self._DEFAULTS
+        self._source = None
         
-        # Load from storage if provided
+        # Load from storage if provided; missing keys keep their defaults
         if set_data:
-            self.armor_class = set_data.readInt("armor_class")
-            self.enchantment_level = set_data.readInt("enchantment_level") 
-            self.durability = set_data.readInt("durability")
-            self.max_durability = set_data.readInt("max_durability")
-            self.material = set_data.readString("material")
-            self.special_properties = set_data.readString("special_properties")
-            self.worn_type = set_data.readString("worn_type")
+            load_fields(self, set_data)
+    
+    def has_property(self, prop):
+        """Check for a special property, e.g. 'blessed'"""
+        return prop in self.property_set
     
     def copy(self):
-        """Create a copy of this equipped data"""
+        """Create a copy of this equipped data, sharing values until either is written"""
         new_data = EquippedData()
-        new_data.armor_class = self.armor_class
-        new_data.enchantment_level = self.enchantment_level
-        new_data.durability = self.durability
-        new_data.max_durability = self.max_durability
-        new_data.material = self.material
-        new_data.special_properties = self.special_properties
-        new_data.worn_type = self.worn_type
+        self.copyTo(new_data)
         return new_data
     
     def copyTo(self, other):
         """Copy this data to another EquippedData instance"""
-        other.armor_class = self.armor_class
-        other.enchantment_level = self.enchantment_level
-        other.durability = self.durability
-        other.max_durability = self.max_durability
-        other.material = self.material
-        other.special_properties = self.special_properties
-        other.worn_type = self.worn_type
+        copy_values(self, other)
     
     def store(self):
-        """Store equipped data to a storage set"""
-        set_data = storage.StorageSet()
-        set_data.storeInt("armor_class", self.armor_class)
-        set_data.storeInt("enchantment_level", self.enchantment_level)
-        set_data.storeInt("durability", self.durability)
-        set_data.storeInt("max_durability", self.max_durability)
-        set_data.storeString("material", self.material)
-        set_data.storeString("special_properties", self.special_properties)
-        set_data.storeString("worn_type", self.worn_type)
-        return set_data
+        """Store equipped data to a storage set, skipping default fields"""
+        return store_fields(self)
 
 def init_equipped():
     """Initialize the equipped item type"""
@@ -75,6 +80,9 @@ def init_equipped():
     # Register commands
     mudsys.add_cmd("equip", None, cmd_equip, "player", 1)
     
+    # Register hooks
+    hooks.add("preprocess_obj_desc", append_equip_hook)
+    
     # Add Python object getters/setters for equipped items
     def get_equipped_armor_class(obj):
         if obj.istype("equipped"):
@@ -165,13 +173,25 @@ def init_equipped():
     # Note: Python object getters/setters would be registered in C code if needed
     # For now, we can access worn_type directly through the data object
 
+def append_equip_hook(info):
+    """Hook to add durability condition to what a looker sees of an equipped item
+    
+    Appends to the looker's look buffer, leaving obj.desc itself untouched.
+    """
+    obj, ch = hooks.parse_info(info)
+    
+    if obj.istype("equipped"):
+        data = obj.get_type_data("equipped")
+        if data:
+            suffix = condition_suffix(data)
+            if suffix:
+                ch.look_buf = ch.look_buf + suffix
+
 def get_equipped_positions(obj):
     """Get body positions for equipped item based on its worn_type"""
     if obj.istype("equipped"):
         data = obj.get_type_data("equipped")
         if data and data.worn_type:
-            # Import here to avoid circular imports
-            from . import gear_config
             return gear_config.get_worn_type_positions(data.worn_type)
     return ""
 
@@ -238,7 +258,6 @@ def do_equip(ch, obj, where=None):
         return
     
     # Get positions this item wants to occupy
-    from . import gear_config
     needed_positions = gear_config.get_worn_type_positions(data.worn_type)
     if not needed_positions:
         ch.send("This doesn't appear to be wearable.")
@@ -0,0 +1,451 @@
+"""
+gear_bench.py
+
+Admin benchmarks for the gear module. Each benchmark builds synthetic data,
+times the code paths it compares and returns a list of report lines, so
+results can be read in-game with the gearbench command or from scripts.
+"""
+import os
+import time
+import tracemalloc
+import storage
+from . import gear_config
+from . import gear_data
+from .wielded import WieldedData, WIELDED_FIELDS
+from .equipped import EquippedData
+from .dice import DiceRoller, parse_dice
+from .gear_registry import GearColumns, REGISTRY_COLUMNS
+
+def _best_time(func, repeat):
+    """Best wall time of repeat calls to func, in seconds"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def _remove_files(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _synthetic_config(items, worn_types):
+    """Build a GearConfig with items entries per category"""
+    config = gear_config.GearConfig()
+    for section, name, category in list(config.categories()):
+        for i in range(items):
+            category.addItem("%s_%s_%d" % (section, name, i))
+    for i in range(worn_types):
+        config.worn_types.add(gear_config.WornType("worn_%d" % i, ["finger", "wrist"], False))
+    return config
+
+def bench_config_load(items=2000, worn_types=500, repeat=5):
+    """Compare StorageSet parsing of gear-config with the compiled sidecar"""
+    path = "misc/gear-bench-config"
+    cache_path = path + ".cache"
+    configs = {"main": _synthetic_config(items, worn_types)}
+    try:
+        set = gear_config._store_configs(configs)
+        set.write(path)
+        set.close()
+        gear_config._write_config_cache(configs, path, cache_path)
+        if gear_config._read_config_cache(path, cache_path) is None:
+            return ["config: sidecar cache could not be written, nothing to compare"]
+        
+        parse_time = _best_time(lambda: gear_config._parse_config_file(path), repeat)
+        cache_time = _best_time(lambda: gear_config._read_config_cache(path, cache_path), repeat)
+        return [
+            "config load: %d items x %d categories, %d worn types (best of %d)" % (
+                items, len(list(configs["main"].categories())), worn_types, repeat),
+            "  StorageSet parse : %8.2f ms  (%d bytes)" % (parse_time * 1000, os.path.getsize(path)),
+            "  sidecar cache    : %8.2f ms  (%d bytes)" % (cache_time * 1000, os.path.getsize(cache_path)),
+            "  speedup          : %8.1fx" % (parse_time / cache_time if cache_time else 0.0),
+        ]
+    finally:
+        _remove_files(path, cache_path)
+
+def bench_batch_edit(entries=5000, repeat=3):
+    """Time seeding entries through one transaction on a detached config"""
+    def seed():
+        config = gear_config.GearConfig()
+        with config.transaction() as txn:
+            for i in range(entries):
+                txn.add_item("wielded.materials", "material_%d" % i)
+        return config
+    
+    seed_time = _best_time(seed, repeat)
+    return [
+        "batch edit: %d staged entries, one commit (best of %d)" % (entries, repeat),
+        "  validate + apply : %8.2f ms  (%.2f us/entry)" % (
+            seed_time * 1000, seed_time * 1e6 / entries),
+    ]
+
+def _dict_data_class(cls):
+    """A __dict__-backed stand-in for cls, as it was before __slots__"""
+    names = list(cls._FIELD_INDEX)
+    def __init__(self, template):
+        for name in names:
+            setattr(self, name, getattr(template, name))
+    return type(cls.__name__ + "Dict", (), {"__init__": __init__})
+
+def _allocated(make, count):
+    """Bytes allocated per object when making count objects with make()"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [make(i) for i in range(count)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del objects
+    return used / count
+
+def _edited_copy(data):
+    """A copy of data that owns its values, as an edited item does"""
+    new_data = data.copy()
+    new_data.durability = data.durability
+    return new_data
+
+def bench_data_memory(count=20000):
+    """Compare per-instance memory of gear data layouts"""
+    lines = ["data memory: %d instances per class, bytes per instance" % count]
+    saved = gear_data.LAZY_LOADING
+    try:
+        gear_data.LAZY_LOADING = False
+        for cls in (WieldedData, EquippedData):
+            template = cls()
+            source = gear_data.store_fields(template, False)
+            dict_cls = _dict_data_class(cls)
+            plain = _allocated(lambda i: dict_cls(template), count)
+            loaded = _allocated(lambda i: cls(source), count)
+            edited = _allocated(lambda i: _edited_copy(template), count)
+            shared = _allocated(lambda i: template.copy(), count)
+            lines.append("  %-13s __dict__: %5.0f   loaded: %5.0f   edited: %5.0f   shared: %5.0f" % (
+                cls.__name__, plain, loaded, edited, shared))
+    finally:
+        gear_data.LAZY_LOADING = saved
+    return lines
+
+def bench_spawn(count=20000, repeat=3):
+    """Time spawning instances from a prototype's data, field copy vs shared"""
+    proto = WieldedData()
+    proto.material = "mithril"
+    proto.damage_dice = "1d8"
+    proto.special_properties = "versatile"
+    names = list(WieldedData._FIELD_INDEX)[:len(WIELDED_FIELDS)]
+    
+    def field_copy():
+        for _ in range(count):
+            data = WieldedData()
+            for name in names:
+                setattr(data, name, getattr(proto, name))
+    
+    def shared_copy():
+        for _ in range(count):
+            proto.copy()
+    
+    copy_time = _best_time(field_copy, repeat)
+    shared_time = _best_time(shared_copy, repeat)
+    return [
+        "spawn: %d wielded copies of one prototype (best of %d)" % (count, repeat),
+        "  field by field   : %8.2f ms" % (copy_time * 1000),
+        "  copy-on-write    : %8.2f ms" % (shared_time * 1000),
+        "  speedup          : %8.1fx" % (copy_time / shared_time if shared_time else 0.0),
+    ]
+
+def _fresh(value):
+    """A new string object equal to value, as storage reads produce"""
+    return value.encode().decode()
+
+def bench_intern(count=20000):
+    """Memory of a synthetic world of wielded items with and without interning"""
+    damage_types = gear_config.get_damage_types() or ("slashing",)
+    materials = gear_config.get_wielded_materials() or ("steel",)
+    fields = ("damage_type", "weapon_category", "material", "special_properties")
+    def values(i):
+        return (damage_types[i % len(damage_types)], "melee",
+                materials[i % len(materials)], "versatile, magical")
+    
+    def make_interned(i):
+        data = WieldedData()
+        for name, value in zip(fields, values(i)):
+            setattr(data, name, _fresh(value))
+        return data
+    
+    def make_plain(i):
+        data = WieldedData()
+        gear_data._own_values(data)
+        for name, value in zip(fields, values(i)):
+            # Write the slot directly, skipping the interning setter
+            setattr(data, "_" + name, _fresh(value))
+        return data
+    
+    plain = _allocated(make_plain, count)
+    interned = _allocated(make_interned, count)
+    return [
+        "intern: %d wielded items, %d string fields each, bytes per item" % (count, len(fields)),
+        "  fresh strings : %8.0f  (%.2f MB total)" % (plain, plain * count / 1e6),
+        "  interned      : %8.0f  (%.2f MB total)" % (interned, interned * count / 1e6),
+        "  saved         : %8.0f  (%.1f%%)" % (plain - interned,
+                                             100.0 * (plain - interned) / plain if plain else 0.0),
+    ]
+
+def bench_dice(rolls=10000, repeat=3):
+    """Compare one-at-a-time damage rolls with a DiceRoller batch"""
+    expressions = [parse_dice(text) for text in ("1d4", "1d6+1", "2d6", "1d8+2", "2d4+1", "1d12")]
+    batch = [expressions[i % len(expressions)] for i in range(rolls)]
+    triples = [dice.as_triple() for dice in batch]
+    roller = DiceRoller(1)
+    single_time = _best_time(lambda: [dice.roll() for dice in batch], repeat)
+    batch_time = _best_time(lambda: roller.roll_many(triples), repeat)
+    return [
+        "dice: %d weapon damage rolls (best of %d), batch backend: %s" % (
+            rolls, repeat, "numpy" if roller.vectorized else "python"),
+        "  one at a time    : %8.2f ms" % (single_time * 1000),
+        "  roll_many batch  : %8.2f ms" % (batch_time * 1000),
+        "  speedup          : %8.1fx" % (single_time / batch_time if batch_time else 0.0),
+    ]
+
+def _synthetic_items(count):
+    """Wielded and equipped data as a zone typically has them: mostly defaults"""
+    materials = gear_config.get_wielded_materials() or ("steel",)
+    items = []
+    for i in range(count):
+        weapon = WieldedData()
+        weapon.material = materials[i % len(materials)]
+        weapon.damage_dice = ("1d6", "1d8", "2d4")[i % 3]
+        armor = EquippedData()
+        armor.armor_class = i % 10
+        armor.worn_type = "shirt"
+        items.append((weapon, armor))
+    return items
+
+def bench_storage(count=5000, repeat=3):
+    """Compare full and sparse item storage: file size and load time"""
+    path = "misc/gear-bench-items"
+    items = _synthetic_items(count)
+    lines = ["storage: %d wielded + %d equipped items (best of %d)" % (count, count, repeat)]
+    try:
+        for label, sparse in (("full", False), ("sparse", True)):
+            set = storage.StorageSet()
+            weapons = storage.StorageList()
+            armors = storage.StorageList()
+            for weapon, armor in items:
+                weapons.add(gear_data.store_fields(weapon, sparse))
+                armors.add(gear_data.store_fields(armor, sparse))
+            set.storeList("wielded", weapons)
+            set.storeList("equipped", armors)
+            set.write(path)
+            set.close()
+            
+            def load():
+                loaded = storage.StorageSet(path)
+                for one in loaded.readList("wielded").sets():
+                    WieldedData(one)
+                for one in loaded.readList("equipped").sets():
+                    EquippedData(one)
+                loaded.close()
+            lines.append("  %-7s: %9d bytes, load %8.2f ms" % (
+                label, os.path.getsize(path), _best_time(load, repeat) * 1000))
+    finally:
+        _remove_files(path)
+    return lines
+
+def bench_lazy(count=5000, repeat=3):
+    """Compare eager and lazy field decoding: load, one-field reads, resave"""
+    set = storage.StorageSet()
+    weapons = storage.StorageList()
+    for weapon, _armor in _synthetic_items(count):
+        weapons.add(weapon.store())
+    set.storeList("wielded", weapons)
+    sources = list(set.readList("wielded").sets())
+    
+    def load():
+        return [WieldedData(one) for one in sources]
+    
+    def load_and_read():
+        return [data.durability for data in load()]
+    
+    def round_trip():
+        return [data.store() for data in load()]
+    
+    lines = ["lazy: %d wielded items (best of %d)" % (count, repeat)]
+    saved = gear_data.LAZY_LOADING
+    try:
+        for label, lazy in (("eager", False), ("lazy", True)):
+            gear_data.LAZY_LOADING = lazy
+            lines.append("  %-6s: load %8.2f ms, read 1 field %8.2f ms, resave %8.2f ms" % (
+                label, _best_time(load, repeat) * 1000,
+                _best_time(load_and_read, repeat) * 1000,
+                _best_time(round_trip, repeat) * 1000))
+    finally:
+        gear_data.LAZY_LOADING = saved
+        set.close()
+    return lines
+
+def bench_registry(count=20000, repeat=3):
+    """Compare a per-object scan with registry queries over the same items"""
+    items = []
+    for i in range(count):
+        weapon = WieldedData()
+        weapon.durability = i % 101
+        weapon.hit_bonus = i % 5
+        items.append((i, weapon))
+    
+    def scan():
+        worn = [uid for uid, data in items
+                if data.max_durability > 0 and data.durability * 100 < 20 * data.max_durability]
+        return worn, sum(data.hit_bonus for _uid, data in items)
+    
+    lines = ["registry: %d wielded items, durability < 20%% + total hit bonus (best of %d)" % (
+        count, repeat)]
+    lines.append("  object scan      : %8.2f ms" % (_best_time(scan, repeat) * 1000))
+    for label, use_numpy in (("registry, python", False), ("registry, numpy", True)):
+        registry = GearColumns("wielded", REGISTRY_COLUMNS["wielded"][1], use_numpy)
+        if use_numpy and not registry.vectorized:
+            lines.append("  %-17s: NumPy not installed" % label)
+            continue
+        for uid, data in items:
+            registry.add(uid, data)
+        
+        def query():
+            return (registry.select(("durability_pct", "<", 20)),
+                    registry.total("hit_bonus"))
+        lines.append("  %-17s: %8.2f ms" % (label, _best_time(query, repeat) * 1000))
+    return lines
+
+def _handwritten_load(data, set_data):
+    """WieldedData loading as the class spelled it out before the schema, field by field"""
+    data.damage_type = set_data.readString("damage_type")
+    data.weapon_category = set_data.readString("weapon_category")
+    data.ranged_type = set_data.readString("ranged_type")
+    data.damage_dice = set_data.readString("damage_dice")
+    data.damage_bonus = set_data.readInt("damage_bonus")
+    data.hit_bonus = set_data.readInt("hit_bonus")
+    data.weapon_speed = set_data.readDouble("weapon_speed")
+    data.reach = set_data.readInt("reach")
+    data.durability = set_data.readInt("durability")
+    data.max_durability = set_data.readInt("max_durability")
+    data.material = set_data.readString("material")
+    data.special_properties = set_data.readString("special_properties")
+    data.special_attacks = set_data.readString("special_attacks")
+
+def _handwritten_store(data):
+    """WieldedData storing as the class spelled it out before the schema, field by field"""
+    set_data = storage.StorageSet()
+    set_data.storeString("damage_type", data.damage_type)
+    set_data.storeString("weapon_category", data.weapon_category)
+    set_data.storeString("ranged_type", data.ranged_type)
+    set_data.storeString("damage_dice", data.damage_dice)
+    set_data.storeInt("damage_bonus", data.damage_bonus)
+    set_data.storeInt("hit_bonus", data.hit_bonus)
+    set_data.storeDouble("weapon_speed", data.weapon_speed)
+    set_data.storeInt("reach", data.reach)
+    set_data.storeInt("durability", data.durability)
+    set_data.storeInt("max_durability", data.max_durability)
+    set_data.storeString("material", data.material)
+    set_data.storeString("special_properties", data.special_properties)
+    set_data.storeString("special_attacks", data.special_attacks)
+    return set_data
+
+def _table_load(data, set_data):
+    """WieldedData loading as load_fields() did before the schema was compiled"""
+    contains = set_data.contains
+    for field in WIELDED_FIELDS:
+        name, kind = field.name, field.kind
+        if contains(name):
+            setattr(data, name, getattr(set_data, gear_data._STORAGE_METHODS[kind][0])(name))
+
+def _table_store(data, sparse):
+    """WieldedData storing as store_fields() did before the schema was compiled"""
+    set_data = storage.StorageSet()
+    for field in WIELDED_FIELDS:
+        name, kind, default = field.name, field.kind, field.default
+        value = getattr(data, name)
+        if not sparse or value != default:
+            getattr(set_data, gear_data._STORAGE_METHODS[kind][1])(name, value)
+    return set_data
+
+def bench_schema(count=5000, repeat=3):
+    """Compare hand-written and table-loop wielded load/store with the schema-generated code"""
+    items = [weapon for weapon, _armor in _synthetic_items(count)]
+    # Full sets, which the hand-written loader needs
+    sources = [gear_data.store_fields(weapon, False) for weapon in items]
+    
+    def load_handwritten():
+        for one in sources:
+            _handwritten_load(WieldedData(), one)
+    
+    def load_table():
+        for one in sources:
+            _table_load(WieldedData(), one)
+    
+    def load_generated():
+        for one in sources:
+            WieldedData(one)
+    
+    def store_handwritten():
+        for weapon in items:
+            _handwritten_store(weapon)
+    
+    def store_table():
+        for weapon in items:
+            _table_store(weapon, False)
+    
+    def store_generated():
+        for weapon in items:
+            gear_data.store_fields(weapon, False)
+    
+    lines = ["schema: %d wielded items, every field (best of %d)" % (count, repeat)]
+    saved = gear_data.LAZY_LOADING
+    try:
+        gear_data.LAZY_LOADING = False
+        for label, func in (("load, hand-written", load_handwritten),
+                            ("load, table loop", load_table),
+                            ("load, generated", load_generated),
+                            ("store, hand-written", store_handwritten),
+                            ("store, table loop", store_table),
+                            ("store, generated", store_generated)):
+            lines.append("  %-20s: %8.2f ms" % (label, _best_time(func, repeat) * 1000))
+    finally:
+        gear_data.LAZY_LOADING = saved
+    return lines
+
+# name -> (function, description)
+BENCHMARKS = {
+    "config": (bench_config_load, "gear-config parse vs compiled sidecar load"),
+    "batch": (bench_batch_edit, "bulk seeding through a GearConfig transaction"),
+    "memory": (bench_data_memory, "per-instance size of wielded/equipped data: dict, loaded, edited, shared"),
+    "spawn": (bench_spawn, "spawning from prototype data: field copy vs copy-on-write"),
+    "intern": (bench_intern, "synthetic world memory with and without string interning"),
+    "dice": (bench_dice, "per-roll damage dice vs one DiceRoller batch"),
+    "storage": (bench_storage, "full vs sparse item storage: file size and load time"),
+    "lazy": (bench_lazy, "eager vs lazy field decoding of loaded items"),
+    "registry": (bench_registry, "per-object scan vs columnar registry queries"),
+    "schema": (bench_schema, "hand-written and table-loop vs schema-generated item load and store"),
+}
+
+def cmd_gearbench(ch, cmd, arg):
+    """
+    Syntax: gearbench <benchmark | all>
+    
+    Runs gear module benchmarks on synthetic data and reports the timings.
+    With no argument, lists the available benchmarks.
+    """
+    name = arg.strip().lower()
+    if not name:
+        ch.send("Available gear benchmarks:")
+        for bench_name, (_func, desc) in BENCHMARKS.items():
+            ch.send("  %-10s %s" % (bench_name, desc))
+        return
+    
+    names = list(BENCHMARKS) if name == "all" else [name]
+    for bench_name in names:
+        if bench_name not in BENCHMARKS:
+            ch.send("No gear benchmark named '%s'." % bench_name)
+            continue
+        for line in BENCHMARKS[bench_name][0]():
+            ch.send(line)
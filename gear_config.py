@@ -5,46 +5,168 @@ Uses nested class structure: Wielded and Equipped classes containing category-sp
 """
 
 import storage
+import event
+import hooks
+import functools
+import hashlib
+import json
+import marshal
 import os
+import sys
+import threading
+import time
+import types
+from collections import namedtuple
 
 # Global gear configuration storage
 gear_configs = {}
+# Named profiles layered over a parent config, see GearOverlay
+gear_overlays = {}
 gear_config_file = "misc/gear-config"
 
+# Seconds without further edits before a scheduled save is written
+SAVE_QUIET_PERIOD = 2.0
+# Seconds between main-thread checks for a scheduled save that is due
+SAVE_CHECK_INTERVAL = 0.5
+
+# Journaled persistence: helper edits are appended to gear_config_journal
+# and replayed over the last full snapshot at load. Once the journal grows
+# past JOURNAL_COMPACT_BYTES a full save is scheduled, which truncates it.
+JOURNAL_ENABLED = True
+JOURNAL_COMPACT_BYTES = 64 * 1024
+gear_config_journal = gear_config_file + ".journal"
+
+# Compiled sidecar cache of the parsed config, keyed by the source file's
+# size, mtime and content hash. Bump the version when to_plain() changes.
+gear_config_cache = gear_config_file + ".cache"
+CONFIG_CACHE_VERSION = 2
+
+# Seconds between heartbeat checks of gear_config_file for out-of-band edits
+HOT_RELOAD_INTERVAL = 5
+
+# Seconds between deliveries of batched change events (one game pulse)
+CHANGE_DISPATCH_INTERVAL = 0.1
+# Sections that change subscribers can listen to
+CHANGE_SECTIONS = ("wielded", "equipped", "worn_types", "profiles")
+
+# Category attribute names for each config section, in storage order
+WIELDED_CATEGORIES = ("damage_types", "weapon_categories", "ranged_types",
+                      "materials", "special_properties", "special_attacks")
+EQUIPPED_CATEGORIES = ("armor_types", "materials", "special_properties")
+
+def intern_value(value):
+    """Return the shared copy of a categorical string value
+    
+    Category items are interned as they enter the config, so a value that
+    names a configured item comes back as the config's own string object.
+    Non-strings are returned unchanged.
+    """
+    return sys.intern(value) if type(value) is str else value
+
 class GearCategory:
-    """Base class for gear categories (damage_types, materials, etc.)"""
+    """Base class for gear categories (damage_types, materials, etc.)
+
+    Items live in an insertion-ordered dict used as a hash index, so
+    membership tests are constant time and iteration keeps the order items
+    were added in. ``generation`` bumps on every add or remove that actually
+    changes the category, giving caches a cheap staleness check. Items are
+    interned, see intern_value().
+    
+    ``listener``, if set, is called as listener(category, added, removed)
+    with iterables of the items each change added and removed.
+    """
     def __init__(self, items=None, set=None):
+        self._index = {}
+        self.generation = 0
+        self._snapshot = None
+        self._frozen = None
+        self.listener = None
         if set is not None:
-            self.items = []
             # Read direct name entries from the storage set
             for item_set in set.sets():
                 name = item_set.readString("name")
                 if name:  # Skip empty entries
-                    self.items.append(name)
+                    self._index[intern_value(name)] = None
         else:
-            self.items = items or []
+            for item in items or []:
+                self._index[intern_value(item)] = None
+    
+    @property
+    def items(self):
+        """Items in insertion order, as a read-only tuple
+        
+        Edit through addItem()/removeItem()/replaceItems(), which keep the
+        index, generation and listener in step; the tuple has no append()
+        or remove(), so old-style in-place edits fail instead of being lost.
+        """
+        return self.snapshot()
     
     def store(self):
         """Returns a storage list with direct name entries"""
         items_list = storage.StorageList()
-        for item in self.items:
+        for item in self._index:
             item_set = storage.StorageSet()
             item_set.storeString("name", item)
             items_list.add(item_set)
         return items_list
     
-    def getItems(self): return self.items
-    def addItem(self, item): 
-        if item not in self.items:
-            self.items.append(item)
+    def __contains__(self, item): return item in self._index
+    def __iter__(self): return iter(self._index)
+    def __len__(self): return len(self._index)
+    
+    def getItems(self): return list(self._index)
+    def contains(self, item): return item in self._index
+    
+    def snapshot(self):
+        """Items as a tuple, rebuilt only when the generation changes"""
+        snap = self._snapshot
+        if snap is None or snap[0] != self.generation:
+            snap = self._snapshot = (self.generation, tuple(self._index))
+        return snap[1]
+    
+    def frozen(self):
+        """Items as a frozenset, rebuilt only when the generation changes"""
+        frozen = self._frozen
+        if frozen is None or frozen[0] != self.generation:
+            frozen = self._frozen = (self.generation, frozenset(self._index))
+        return frozen[1]
+    
+    def addItem(self, item):
+        """Add an item, returns True if the category changed"""
+        if item in self._index:
+            return False
+        item = intern_value(item)
+        self._index[item] = None
+        self.generation += 1
+        if self.listener is not None:
+            self.listener(self, (item,), ())
+        return True
     def removeItem(self, item):
-        if item in self.items:
-            self.items.remove(item)
+        """Remove an item, returns True if the category changed"""
+        if item not in self._index:
+            return False
+        del self._index[item]
+        self.generation += 1
+        if self.listener is not None:
+            self.listener(self, (), (item,))
+        return True
+    
+    def replaceItems(self, items):
+        """Replace every item at once, as a single generation bump"""
+        old_index = self._index
+        self._index = dict.fromkeys(map(intern_value, items))
+        self.generation += 1
+        if self.listener is not None:
+            self.listener(self, [item for item in self._index if item not in old_index],
+                          [item for item in old_index if item not in self._index])
 
 class Wielded:
     """Wielded gear configuration"""
-    def __init__(self, set=None):
-        if set is not None:
+    def __init__(self, set=None, plain=None):
+        if plain is not None:
+            for name in WIELDED_CATEGORIES:
+                setattr(self, name, GearCategory(plain[name]))
+        elif set is not None:
             self.damage_types = GearCategory(set=set.readList("damage_types"))
             self.weapon_categories = GearCategory(set=set.readList("weapon_categories"))
             self.ranged_types = GearCategory(set=set.readList("ranged_types"))
@@ -69,11 +191,18 @@ class Wielded:
         set.storeList("special_properties", self.special_properties.store())
         set.storeList("special_attacks", self.special_attacks.store())
         return set
+    
+    def to_plain(self):
+        """Returns a dict of category name to item tuple"""
+        return {name: getattr(self, name).snapshot() for name in WIELDED_CATEGORIES}
 
 class Equipped:
     """Equipped gear configuration"""
-    def __init__(self, set=None):
-        if set is not None:
+    def __init__(self, set=None, plain=None):
+        if plain is not None:
+            for name in EQUIPPED_CATEGORIES:
+                setattr(self, name, GearCategory(plain[name]))
+        elif set is not None:
             self.armor_types = GearCategory(set=set.readList("armor_types"))
             self.materials = GearCategory(set=set.readList("materials"))
             self.special_properties = GearCategory(set=set.readList("special_properties"))
@@ -89,6 +218,10 @@ class Equipped:
         set.storeList("materials", self.materials.store())
         set.storeList("special_properties", self.special_properties.store())
         return set
+    
+    def to_plain(self):
+        """Returns a dict of category name to item tuple"""
+        return {name: getattr(self, name).snapshot() for name in EQUIPPED_CATEGORIES}
 
 class WornType:
     """Represents a worn type with positions and built-in flag"""
@@ -113,12 +246,24 @@ class WornType:
         return set
 
 class WornTypes:
-    """Worn types configuration"""
-    def __init__(self, storage_set=None):
+    """Worn types configuration
+    
+    ``by_position`` is a reverse index of body position to the names of
+    the worn types that use it, kept up to date by every method that
+    changes a worn type. ``listener``, if set, is called with the names
+    of the worn types each change touched.
+    """
+    def __init__(self, storage_set=None, plain=None):
         """Initialize worn types from storage or create defaults"""
         self.worn_types = {}
+        self.by_position = {}
+        self.generation = 0
+        self.listener = None
         
-        if storage_set and storage_set.contains("worn_types"):
+        if plain is not None:
+            for name, positions, builtin in plain:
+                self.worn_types[name] = WornType(name, list(positions), builtin)
+        elif storage_set and storage_set.contains("worn_types"):
             worn_types_list = storage_set.readList("worn_types")
             for worn_type_set in worn_types_list.sets():
                 name = worn_type_set.readString("name")
@@ -140,6 +285,24 @@ class WornTypes:
             self._create_default_worn_types()
             # Mark that we need to save these defaults
             self._needs_save = True
+        self._reindex()
+    
+    def _index_positions(self, worn_type):
+        for position in worn_type.positions:
+            self.by_position.setdefault(position, {})[worn_type.name] = None
+    
+    def _unindex_positions(self, worn_type):
+        for position in worn_type.positions:
+            users = self.by_position.get(position)
+            if users is not None:
+                users.pop(worn_type.name, None)
+                if not users:
+                    del self.by_position[position]
+    
+    def _reindex(self):
+        self.by_position = {}
+        for worn_type in self.worn_types.values():
+            self._index_positions(worn_type)
     
     def _create_default_worn_types(self):
         """Create default built-in worn types"""
@@ -160,6 +323,54 @@ class WornTypes:
             worn_type = WornType(name, positions, builtin)
             self.worn_types[name] = worn_type
     
+    def add(self, worn_type):
+        """Add a WornType, returns False if the name is already taken"""
+        if worn_type.name in self.worn_types:
+            return False
+        self.worn_types[worn_type.name] = worn_type
+        self._index_positions(worn_type)
+        self.generation += 1
+        if self.listener is not None:
+            self.listener((worn_type.name,))
+        return True
+    
+    def remove(self, name):
+        """Remove a worn type by name, returns the removed WornType or None"""
+        worn_type = self.worn_types.pop(name, None)
+        if worn_type is not None:
+            self._unindex_positions(worn_type)
+            self.generation += 1
+            if self.listener is not None:
+                self.listener((name,))
+        return worn_type
+    
+    def set_positions(self, name, positions):
+        """Replace the positions of a worn type, returns False if unknown"""
+        worn_type = self.worn_types.get(name)
+        if worn_type is None:
+            return False
+        positions = list(positions)
+        if worn_type.positions != positions:
+            self._unindex_positions(worn_type)
+            worn_type.positions = positions
+            self._index_positions(worn_type)
+            self.generation += 1
+            if self.listener is not None:
+                self.listener((name,))
+        return True
+    
+    def replace_plain(self, plain):
+        """Replace every worn type from to_plain() data as one generation bump"""
+        old = {wt.name: wt.positions for wt in self.worn_types.values()}
+        self.worn_types = {name: WornType(name, list(positions), builtin)
+                           for name, positions, builtin in plain}
+        self._reindex()
+        self.generation += 1
+        if self.listener is not None:
+            self.listener([name for name in set(old) | set(self.worn_types)
+                           if name not in old or name not in self.worn_types or
+                           old[name] != self.worn_types[name].positions])
+    
     def store(self):
         """Returns a storage set representation"""
         set = storage.StorageSet()
@@ -168,27 +379,96 @@ class WornTypes:
             worn_types_list.add(worn_type.store())
         set.storeList("worn_types", worn_types_list)
         return set
+    
+    def users_of(self, position):
+        """Names of the worn types that use position, in definition order"""
+        return tuple(self.by_position.get(position, ()))
+    
+    def to_plain(self):
+        """Returns a tuple of (name, positions, builtin) tuples"""
+        return tuple((wt.name, tuple(wt.positions), wt.builtin)
+                     for wt in self.worn_types.values())
 
 class GearConfig:
     """Main gear configuration class"""
-    def __init__(self, storage_set=None):
-        """Initialize gear configuration from storage or create defaults"""
-        if storage_set:
+    def __init__(self, storage_set=None, plain=None):
+        """Initialize gear configuration from storage, plain data or defaults"""
+        if plain is not None:
+            # Load from the compiled cache, see to_plain()
+            self.wielded = Wielded(plain=plain["wielded"])
+            self.equipped = Equipped(plain=plain["equipped"])
+            self.worn_types = WornTypes(plain=plain["worn_types"])
+        elif storage_set:
             # Load from storage
             self.wielded = Wielded(storage_set.readSet("wielded") if storage_set.contains("wielded") else None)
             self.equipped = Equipped(storage_set.readSet("equipped") if storage_set.contains("equipped") else None)
-            self.worn_types = WornTypes(storage_set if storage_set.contains("worn_types") else None)
+            self.worn_types = WornTypes(storage_set.readSet("worn_types") if storage_set.contains("worn_types") else None)
             
-            # Check if any component created defaults and needs saving
-            if hasattr(self.worn_types, '_needs_save') and self.worn_types._needs_save:
-                # Save the configuration since we added defaults
-                import threading
-                threading.Timer(0.1, lambda: save_gear_configs()).start()
+            # Components that filled in defaults want a save; whoever loaded
+            # this schedules it, see _finish_load()
+            self.needs_save = getattr(self.worn_types, '_needs_save', False)
         else:
             # Create defaults
             self.wielded = Wielded()
             self.equipped = Equipped()
             self.worn_types = WornTypes()
+        self._snapshot = None
+        # Bumped by the category and worn type listeners on every change
+        self._generation = 0
+        # Reverse index of item to the 'section.category' paths holding it
+        self.item_index = {}
+        self._paths = {}
+        for section, name, category in self.categories():
+            path = section + "." + name
+            self._paths[id(category)] = (path, section, name)
+            category.listener = self._on_category_change
+            self._on_category_change(category, category, ())
+        self.worn_types.listener = self._on_worn_types_change
+    
+    def _on_worn_types_change(self, names):
+        self._generation += 1
+        if gear_configs.get("main") is self:
+            _change_bus.publish("worn_types", names)
+            _profiles_changed()
+    
+    def _on_category_change(self, category, added, removed):
+        path, section, name = self._paths[id(category)]
+        self._generation += 1
+        if gear_configs.get("main") is self and (added or removed):
+            _change_bus.publish(section, (name,))
+            _profiles_changed()
+        for item in added:
+            self.item_index.setdefault(item, {})[path] = None
+        for item in removed:
+            paths = self.item_index.get(item)
+            if paths is not None:
+                paths.pop(path, None)
+                if not paths:
+                    del self.item_index[item]
+    
+    def paths_of(self, item):
+        """The 'section.category' paths that contain item"""
+        return tuple(self.item_index.get(item, ()))
+    
+    def categories(self):
+        """Yield (section, name, GearCategory) for every category"""
+        for name in WIELDED_CATEGORIES:
+            yield "wielded", name, getattr(self.wielded, name)
+        for name in EQUIPPED_CATEGORIES:
+            yield "equipped", name, getattr(self.equipped, name)
+    
+    @property
+    def generation(self):
+        """Change counter of the whole config; grows on any change"""
+        return self._generation
+    
+    def snapshot(self):
+        """Return an immutable GearSnapshot, cached until the next mutation"""
+        generation = self.generation
+        snap = self._snapshot
+        if snap is None or snap.generation != generation:
+            snap = self._snapshot = GearSnapshot(self, generation)
+        return snap
     
     def store(self):
         """Returns a storage set representation"""
@@ -197,32 +477,829 @@ class GearConfig:
         set.storeSet("equipped", self.equipped.store())
         set.storeSet("worn_types", self.worn_types.store())
         return set
+    
+    def to_plain(self):
+        """Returns nested dicts/tuples of builtins, suitable for marshal"""
+        return {
+            "wielded": self.wielded.to_plain(),
+            "equipped": self.equipped.to_plain(),
+            "worn_types": self.worn_types.to_plain(),
+        }
+    
+    def restore_plain(self, plain):
+        """Reset contents in place from to_plain() data
+        
+        Generations keep increasing, so snapshots taken before the restore
+        are never mistaken for current ones.
+        """
+        for section, name, category in self.categories():
+            category.replaceItems(plain[section][name])
+        self.worn_types.replace_plain(plain["worn_types"])
+    
+    def transaction(self):
+        """Return a GearConfigTransaction for staging a batch of edits
+        
+        Use it as a context manager: edits are validated and applied
+        together when the block exits cleanly and discarded otherwise.
+        Inside a transaction on the main config the module helpers
+        (add_wielded_material, add_worn_type, ...) stage into it as well.
+        """
+        global _active_transaction
+        if _active_transaction is not None and _active_transaction.config is self:
+            return _active_transaction
+        return GearConfigTransaction(self)
 
-def save_gear_configs(data=None):
-    """Save all gear configurations - follows bulletin.py pattern"""
+class GearOverlay:
+    """A named profile that stores only its differences from a parent
+    
+    ``parent`` is "main" or the name of another overlay. Per category path
+    ('wielded.materials', ...) the overlay keeps the items it adds and the
+    inherited items it hides. Worn types are always inherited, since the C
+    worn system has a single global set of them.
+    """
+    def __init__(self, parent="main", set=None, plain=None):
+        self.parent = parent
+        self.added = {}
+        self.removed = {}
+        self.generation = 0
+        if plain is not None:
+            self.parent = plain["parent"]
+            for path, items in plain["added"].items():
+                self.added[path] = GearCategory(items)
+            for path, items in plain["removed"].items():
+                self.removed[path] = GearCategory(items)
+        elif set is not None:
+            self.parent = set.readString("parent") or "main"
+            for key, diff in (("added", self.added), ("removed", self.removed)):
+                for item_set in set.readList(key).sets():
+                    path = item_set.readString("path")
+                    name = item_set.readString("name")
+                    if path and name:
+                        diff.setdefault(path, GearCategory()).addItem(name)
+    
+    def _change(self, path, item, to_diff, from_diff):
+        changed = False
+        if path in from_diff:
+            changed = from_diff[path].removeItem(item)
+        if to_diff is not None:
+            changed = to_diff.setdefault(path, GearCategory()).addItem(item) or changed
+        if changed:
+            self.generation += 1
+            _profiles_changed()
+        return changed
+    
+    def add_item(self, path, item):
+        """Make item part of the category at path for this profile"""
+        return self._change(path, item, self.added, self.removed)
+    
+    def remove_item(self, path, item):
+        """Hide item from the category at path for this profile"""
+        return self._change(path, item, self.removed, self.added)
+    
+    def reset_item(self, path, item):
+        """Drop any override of item, inheriting it from the parent again"""
+        return (self._change(path, item, None, self.added) |
+                self._change(path, item, None, self.removed))
+    
+    def store(self):
+        """Returns a storage set representation"""
+        set = storage.StorageSet()
+        set.storeString("parent", self.parent)
+        for key, diff in (("added", self.added), ("removed", self.removed)):
+            items_list = storage.StorageList()
+            for path, category in diff.items():
+                for item in category:
+                    item_set = storage.StorageSet()
+                    item_set.storeString("path", path)
+                    item_set.storeString("name", item)
+                    items_list.add(item_set)
+            set.storeList(key, items_list)
+        return set
+    
+    def to_plain(self):
+        """Returns nested dicts/tuples of builtins, suitable for marshal"""
+        return {
+            "parent": self.parent,
+            "added": {path: cat.snapshot() for path, cat in self.added.items() if len(cat)},
+            "removed": {path: cat.snapshot() for path, cat in self.removed.items() if len(cat)},
+        }
+
+WieldedSnapshot = namedtuple("WieldedSnapshot", WIELDED_CATEGORIES)
+EquippedSnapshot = namedtuple("EquippedSnapshot", EQUIPPED_CATEGORIES)
+
+class GearSnapshot:
+    """Immutable view of a GearConfig at a single generation
+    
+    Categories are tuples in configuration order, ``worn_types`` is a
+    read-only mapping of worn type name to a tuple of positions,
+    ``worn_type_names`` a tuple of its names and ``builtin_worn_types`` a
+    frozenset of names that cannot be removed.
+    """
+    __slots__ = ("generation", "wielded", "equipped", "worn_types",
+                 "worn_type_names", "builtin_worn_types", "_members")
+    
+    def __init__(self, config=None, generation=0):
+        self.generation = generation
+        self._members = {}
+        if config is None:
+            self.wielded = WieldedSnapshot(*[()] * len(WIELDED_CATEGORIES))
+            self.equipped = EquippedSnapshot(*[()] * len(EQUIPPED_CATEGORIES))
+            self.worn_types = types.MappingProxyType({})
+            self.worn_type_names = ()
+            self.builtin_worn_types = frozenset()
+            return
+        self.wielded = WieldedSnapshot(*[getattr(config.wielded, name).snapshot()
+                                         for name in WIELDED_CATEGORIES])
+        self.equipped = EquippedSnapshot(*[getattr(config.equipped, name).snapshot()
+                                           for name in EQUIPPED_CATEGORIES])
+        worn_types = config.worn_types.worn_types
+        self.worn_types = types.MappingProxyType(
+            {name: tuple(wt.positions) for name, wt in worn_types.items()})
+        self.worn_type_names = tuple(worn_types)
+        self.builtin_worn_types = frozenset(
+            name for name, wt in worn_types.items() if wt.builtin)
+    
+    @classmethod
+    def overlaid(cls, base, overlay):
+        """Flatten overlay on top of the base snapshot into a new snapshot"""
+        snap = cls.__new__(cls)
+        snap.generation = base.generation + overlay.generation
+        snap._members = {}
+        for section, names, tuple_type in (("wielded", WIELDED_CATEGORIES, WieldedSnapshot),
+                                           ("equipped", EQUIPPED_CATEGORIES, EquippedSnapshot)):
+            inherited = getattr(base, section)
+            items = []
+            for name in names:
+                path = section + "." + name
+                parent_items = getattr(inherited, name)
+                removed = overlay.removed.get(path)
+                added = overlay.added.get(path)
+                if removed is not None and len(removed):
+                    parent_items = tuple(item for item in parent_items if item not in removed)
+                if added is not None and len(added):
+                    parent_items += tuple(item for item in added if item not in parent_items)
+                items.append(parent_items)
+            setattr(snap, section, tuple_type(*items))
+        snap.worn_types = base.worn_types
+        snap.worn_type_names = base.worn_type_names
+        snap.builtin_worn_types = base.builtin_worn_types
+        return snap
+    
+    def contains(self, path, item):
+        """Constant-time membership test for a 'section.category' path"""
+        members = self._members.get(path)
+        if members is None:
+            section, name = path.split(".")
+            members = self._members[path] = frozenset(getattr(getattr(self, section), name))
+        return item in members
+
+_EMPTY_SNAPSHOT = GearSnapshot()
+
+class SaveScheduler:
+    """Coalesces bursts of save requests into a single write
+    
+    request() marks the config dirty; tick(), run every SAVE_CHECK_INTERVAL
+    from an event update on the main thread, writes once no further
+    request has arrived for ``quiet_period`` seconds. flush() writes any
+    pending save immediately. A failed write leaves the save pending, and
+    tick() tries again after another quiet period.
+    """
+    def __init__(self, write_func, quiet_period=SAVE_QUIET_PERIOD):
+        self.write_func = write_func
+        self.quiet_period = quiet_period
+        self.requests = 0
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.last_error = None
+        self._pending = 0
+        self._last_request = 0.0
+    
+    def request(self):
+        """Schedule a save after the quiet period"""
+        self.requests += 1
+        self._pending += 1
+        self._last_request = time.monotonic()
+    
+    def pending(self):
+        """Number of save requests waiting to be written"""
+        return self._pending
+    
+    def tick(self):
+        """Write a pending save whose quiet period has passed
+        
+        Returns True if a write happened. Errors are recorded, not raised.
+        """
+        if not self._pending or time.monotonic() - self._last_request < self.quiet_period:
+            return False
+        try:
+            return self.flush()
+        except Exception:
+            # Still pending; back off for a quiet period before retrying
+            self._last_request = time.monotonic()
+            return False
+    
+    def flush(self, force=False):
+        """Write now if a save is pending (or always, if force is set)
+        
+        Returns True if a write happened. On failure the save stays
+        pending and the error is re-raised.
+        """
+        pending = self._pending
+        if not pending and not force:
+            return False
+        try:
+            self.write_func()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            raise
+        # Requests made during the write (none, on one thread) stay pending
+        self._pending -= pending
+        self.writes += 1
+        self.coalesced += max(0, pending - 1)
+        return True
+    
+    def stats(self):
+        """Return a dict of request/write/coalesce/failure counters"""
+        return {
+            'requests': self.requests,
+            'writes': self.writes,
+            'coalesced': self.coalesced,
+            'pending': self._pending,
+            'failures': self.failures,
+            'last_error': self.last_error,
+        }
+
+class OperationStats:
+    """Call count and wall time of one gear_config operation"""
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.last = 0.0
+        self.max = 0.0
+    
+    def record(self, elapsed, failed=False):
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed
+        self.last = elapsed
+        self.max = max(self.max, elapsed)
+    
+    def as_dict(self):
+        return {'calls': self.calls, 'errors': self.errors, 'total': self.total,
+                'last': self.last, 'max': self.max,
+                'mean': self.total / self.calls if self.calls else 0.0}
+
+# Timings for the expensive config paths, see get_gear_config_stats()
+_op_stats = {name: OperationStats() for name in ("load", "save", "register", "reload")}
+# Bytes written to each config file since boot
+_bytes_written = {'config': 0, 'cache': 0, 'journal': 0}
+
+def _timed(name):
+    """Decorator recording each call of the function in _op_stats[name]"""
+    stats = _op_stats[name]
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                stats.record(time.perf_counter() - start, failed)
+        return wrapper
+    return decorator
+
+def _write_storage_set(set, path):
+    """Write a storage set atomically: temp file, fsync, then rename"""
+    tmp_path = path + ".tmp"
+    set.write(tmp_path)
+    with open(tmp_path, "rb") as fl:
+        os.fsync(fl.fileno())
+    os.replace(tmp_path, path)
+
+def _store_configs(configs, overlays=None):
+    """Returns a storage set holding every config and overlay"""
     set = storage.StorageSet()
     list = storage.StorageList()
     set.storeList("list", list)
-    for key, val in gear_configs.items():
+    for key, val in configs.items():
         one_set = storage.StorageSet()
         one_set.storeString("key", key)
         one_set.storeSet("val", val.store())
         list.add(one_set)
-    set.write(gear_config_file)
+    overlay_list = storage.StorageList()
+    set.storeList("overlays", overlay_list)
+    for key, val in (overlays or {}).items():
+        one_set = storage.StorageSet()
+        one_set.storeString("key", key)
+        one_set.storeSet("val", val.store())
+        overlay_list.add(one_set)
+    return set
+
+@_timed("save")
+def _write_gear_configs():
+    """Write every gear config to gear_config_file and reset the journal
+    
+    Holding the journal lock while storing means every record already in
+    the journal is covered by the snapshot, so the journal can be dropped.
+    """
+    if gear_configs.get("main") is None:
+        # Nothing was loaded; writing now would replace the file with nothing
+        raise ValueError("no gear config loaded, not saving over %s" % gear_config_file)
+    with _journal_lock:
+        set = _store_configs(gear_configs, gear_overlays)
+        _write_storage_set(set, gear_config_file)
+        set.close()
+        _bytes_written['config'] += os.path.getsize(gear_config_file)
+        _watcher.mark_current()
+        _bytes_written['cache'] += _write_config_cache(
+            gear_configs, gear_config_file, gear_config_cache, gear_overlays)
+        if os.path.exists(gear_config_journal):
+            os.remove(gear_config_journal)
+        _journal_stats['size'] = 0
+        _journal_stats['compactions'] += 1
+
+_save_scheduler = SaveScheduler(_write_gear_configs)
+
+def save_gear_configs(data=None):
+    """Save all gear configurations now - follows bulletin.py pattern
+    
+    Any save already scheduled by request_save() is folded into this write.
+    """
+    # Never write before the file has been read, or we would save nothing
+    init_gear_config()
+    _save_scheduler.flush(force=True)
+
+def request_save():
+    """Schedule a coalesced save of all gear configurations"""
+    _save_scheduler.request()
+
+def flush_pending_save(info=None):
+    """Write a scheduled save immediately, if one is pending"""
+    return _save_scheduler.flush()
+
+def save_heartbeat(owner=None, data=None, arg=None):
+    """Periodic update: write a scheduled save once its quiet period passes"""
+    return _save_scheduler.tick()
+
+def get_save_stats():
+    """Get save scheduler counters: requests, writes, coalesced, pending"""
+    return _save_scheduler.stats()
+
+# Mutation journal
+_journal_lock = threading.RLock()
+_journal_stats = {'appended': 0, 'replayed': 0, 'skipped': 0,
+                  'compactions': 0, 'size': 0}
+
+def _journal(record, save=False):
+    """Persist one helper edit
+    
+    In journal mode the record is appended to gear_config_journal. Without
+    the journal, edits flagged with save schedule a full save as before.
+    """
+    if not JOURNAL_ENABLED:
+        if save:
+            request_save()
+        return
+    _append_journal([record])
+
+def _append_journal(records):
+    """Append records to the journal as one line each, then fsync"""
+    data = "".join(json.dumps(record, separators=(",", ":")) + "\n"
+                   for record in records)
+    with _journal_lock:
+        with open(gear_config_journal, "a") as fl:
+            fl.write(data)
+            fl.flush()
+            os.fsync(fl.fileno())
+            size = fl.tell()
+        _bytes_written['journal'] += len(data)
+        _journal_stats['appended'] += len(records)
+        _journal_stats['size'] = size
+    if size > JOURNAL_COMPACT_BYTES:
+        # Compaction is just a full save, written by the next save_heartbeat
+        request_save()
+
+def _apply_record(config, record):
+    """Apply one journal record to a config, returns True if it changed
+    anything. Records are idempotent."""
+    op = record["op"]
+    if op == "add":
+        return _resolve_category(config, record["path"]).addItem(record["item"])
+    elif op == "remove":
+        return _resolve_category(config, record["path"]).removeItem(record["item"])
+    elif op == "worn_add":
+        return config.worn_types.add(WornType(record["name"], list(record["positions"]), False))
+    elif op == "worn_remove":
+        return config.worn_types.remove(record["name"]) is not None
+    elif op == "worn_update":
+        generation = config.worn_types.generation
+        config.worn_types.set_positions(record["name"], record["positions"])
+        return config.worn_types.generation != generation
+    raise ValueError("unknown journal op: %s" % op)
+
+def _journal_offset():
+    """Current end of gear_config_journal in bytes, 0 if there is none"""
+    try:
+        return os.path.getsize(gear_config_journal)
+    except OSError:
+        return 0
+
+def _apply_journal(configs, start=0, end=None):
+    """Apply gear_config_journal records to configs, touching nothing else
+    
+    Only the records between byte offsets start and end (the end of the
+    file when None) are applied. A torn final line (crash mid-append) or
+    an unknown record is skipped rather than aborting the load. Returns
+    (replayed, skipped) counts.
+    """
+    replayed = skipped = 0
+    if not os.path.exists(gear_config_journal):
+        return replayed, skipped
+    with open(gear_config_journal, "rb") as fl:
+        fl.seek(start)
+        data = fl.read() if end is None else fl.read(max(0, end - start))
+    for line in data.decode("utf-8", "replace").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+            config = configs.get(record.get("key", "main"))
+            if config is None:
+                raise KeyError(record.get("key"))
+            _apply_record(config, record)
+            replayed += 1
+        except (ValueError, KeyError, AttributeError, TypeError):
+            skipped += 1
+    return replayed, skipped
+
+def _count_replay(replayed, skipped):
+    """Add replay counts from _apply_journal() to the journal stats"""
+    _journal_stats['replayed'] += replayed
+    _journal_stats['skipped'] += skipped
+    _journal_stats['size'] = _journal_offset()
+
+def _replay_journal(configs, start=0, end=None):
+    """Replay gear_config_journal over configs and count it, see _apply_journal()"""
+    _count_replay(*_apply_journal(configs, start, end))
+
+def get_journal_stats():
+    """Get journal counters: appended, replayed, skipped, compactions, size"""
+    return dict(_journal_stats)
+
+# Compiled config cache
+def _config_cache_key(path):
+    """Return (size, mtime_ns, sha1) identifying the contents of path"""
+    st = os.stat(path)
+    with open(path, "rb") as fl:
+        digest = hashlib.sha1(fl.read()).hexdigest()
+    return (st.st_size, st.st_mtime_ns, digest)
+
+def _config_cache_data(configs, path, overlays=None):
+    """Marshal sidecar bytes of configs for the current contents of path, or None"""
+    try:
+        return marshal.dumps({
+            "version": CONFIG_CACHE_VERSION,
+            "key": _config_cache_key(path),
+            "configs": {key: val.to_plain() for key, val in configs.items()},
+            "overlays": {key: val.to_plain() for key, val in (overlays or {}).items()},
+        })
+    except (OSError, ValueError):
+        return None
+
+def _write_config_cache(configs, path, cache_path, overlays=None):
+    """Write a marshal sidecar of configs for the current contents of path
+    
+    The cache is only an accelerator, so failures to write it are ignored.
+    Returns the number of bytes written.
+    """
+    return _store_config_cache(_config_cache_data(configs, path, overlays), cache_path)
+
+def _store_config_cache(data, cache_path):
+    """Write sidecar bytes from _config_cache_data(), returns bytes written"""
+    if data is None:
+        return 0
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as fl:
+            fl.write(data)
+        os.replace(tmp_path, cache_path)
+        return len(data)
+    except (OSError, ValueError):
+        return 0
+
+def _read_config_cache(path, cache_path):
+    """Return (configs, overlays) dicts from the sidecar, or None on a miss"""
+    try:
+        with open(cache_path, "rb") as fl:
+            data = marshal.loads(fl.read())
+        if (data["version"] != CONFIG_CACHE_VERSION or
+                tuple(data["key"]) != _config_cache_key(path)):
+            return None
+        return ({key: GearConfig(plain=plain) for key, plain in data["configs"].items()},
+                {key: GearOverlay(plain=plain) for key, plain in data["overlays"].items()})
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+
+def _parse_config_file(path):
+    """Return (configs, overlays) dicts parsed from a StorageSet file"""
+    configs = {}
+    overlays = {}
+    set = storage.StorageSet(path)
+    for config in set.readList("list").sets():
+        key = config.readString("key")
+        configs[key] = GearConfig(config.readSet("val"))
+    for overlay in set.readList("overlays").sets():
+        key = overlay.readString("key")
+        overlays[key] = GearOverlay(set=overlay.readSet("val"))
     set.close()
+    return configs, overlays
 
+@_timed("load")
 def load_gear_configs():
-    """Load gear configurations - follows bulletin.py pattern"""
+    """Load gear configurations - follows bulletin.py pattern
+    
+    The last full snapshot is read first, from the compiled sidecar when
+    its key still matches the file and by parsing the StorageSet otherwise.
+    Any journaled edits made since that snapshot are replayed on top of it.
+    """
     if not os.path.exists(gear_config_file):
         # Create default configuration
         create_default_gear_config()
         return
     
-    set = storage.StorageSet(gear_config_file)
-    for config in set.readList("list").sets():
-        key = config.readString("key")
-        gear_configs[key] = GearConfig(config.readSet("val"))
-    set.close()
+    _watcher.mark_current()
+    configs, overlays = _read_configs(gear_config_file, gear_config_cache)
+    gear_configs.update(configs)
+    gear_overlays.update(overlays)
+
+# A load built by _load_configs(): cache is sidecar bytes still to be
+# written (None if it was read from the sidecar), journal the (replayed,
+# skipped) counts and needs_save whether a parsed config asked for a save
+LoadedConfigs = namedtuple("LoadedConfigs", "configs overlays cache journal needs_save")
+
+def _load_configs(path, cache_path, journal_end=None):
+    """Build a LoadedConfigs for path: sidecar or parse, plus journal
+    
+    The journal is applied up to byte offset journal_end, or to its end
+    when None. Nothing outside the new configs is changed, so this can run
+    off the main thread; _finish_load() does the rest on the main thread.
+    """
+    loaded = _read_config_cache(path, cache_path)
+    cache = None
+    if loaded is None:
+        loaded = _parse_config_file(path)
+        cache = _config_cache_data(loaded[0], path, loaded[1])
+    _check_profile_parents(loaded[1])
+    journal = _apply_journal(loaded[0], 0, journal_end)
+    needs_save = any(getattr(config, "needs_save", False) for config in loaded[0].values())
+    return LoadedConfigs(loaded[0], loaded[1], cache, journal, needs_save)
+
+def _finish_load(loaded, cache_path):
+    """Main thread half of a load: write the sidecar, count, schedule a save"""
+    if loaded.cache is not None:
+        _store_config_cache(loaded.cache, cache_path)
+    _count_replay(*loaded.journal)
+    if loaded.needs_save:
+        request_save()
+
+def _read_configs(path, cache_path):
+    """Return (configs, overlays) for path, loaded on the calling thread"""
+    loaded = _load_configs(path, cache_path)
+    _finish_load(loaded, cache_path)
+    return loaded.configs, loaded.overlays
+
+@_timed("reload")
+def _swap_configs(configs, overlays, journal_start=None):
+    """Install freshly loaded configs and resync worn types with C
+    
+    Each key is replaced by a single dict assignment, so readers see the
+    old GearConfig or the new one and never a partly loaded mix. Callers
+    run this on the main thread, between commands and OLC input. Profiles
+    are replaced as a set, so one deleted from the file goes away, and the
+    change bus gets every name from before and after the swap. When the
+    configs were loaded with the journal replayed only up to journal_start,
+    the rest of it is replayed first, so edits journaled during a
+    background load are kept.
+    """
+    old_main = gear_configs.get("main")
+    with _journal_lock:
+        if journal_start is not None:
+            _replay_journal(configs, journal_start)
+        for key, config in configs.items():
+            gear_configs[key] = config
+        profiles = set(gear_overlays) | set(overlays)
+        gear_overlays.clear()
+        gear_overlays.update(overlays)
+        for name in profiles - set(overlays):
+            _profile_cache.pop(name, None)
+        _profiles_changed()
+    main = gear_configs.get("main")
+    if main is None:
+        return None
+    if "main" in configs:
+        # Names from before the swap too, so removals reach subscribers;
+        # every category name is in both, as the category set is fixed
+        _change_bus.publish("wielded", WIELDED_CATEGORIES)
+        _change_bus.publish("equipped", EQUIPPED_CATEGORIES)
+        worn_types = set(main.worn_types.worn_types)
+        if old_main is not None:
+            worn_types.update(old_main.worn_types.worn_types)
+        _change_bus.publish("worn_types", worn_types)
+    if profiles:
+        _change_bus.publish("profiles", profiles)
+    return _worn_sync.reconcile(main)
+
+def reload_gear_configs():
+    """Re-read gear_config_file now and swap it in, returns the sync report"""
+    init_gear_config()
+    _watcher.mark_current()
+    return _swap_configs(*_read_configs(gear_config_file, gear_config_cache))
+
+class ConfigWatcher:
+    """Reloads gear_config_file when it is changed out of band
+    
+    check() runs off the game heartbeat. It compares the file's size and
+    mtime with the last version we loaded or wrote. On a change it parses
+    the file on a background thread; a later check() swaps the result in
+    on the main thread.
+    
+    The background thread only builds the new configs (_load_configs());
+    the sidecar write, stats and any save it calls for happen at the swap.
+    The background load replays the journal only up to where it ended when
+    the load started; the swap replays the rest. If a full save compacted
+    the journal meanwhile, the file on disk is that save and the load is
+    dropped.
+    """
+    def __init__(self, path, cache_path):
+        self.path = path
+        self.cache_path = cache_path
+        self.signature = None
+        self.reloads = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self._thread = None
+        self._loaded = None
+    
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_size, st.st_mtime_ns)
+    
+    def mark_current(self):
+        """Record the file as it is now as already loaded"""
+        self.signature = self._stat()
+    
+    def check(self):
+        """Swap in a finished background load, or start one if the file changed"""
+        loaded, self._loaded = self._loaded, None
+        if loaded is not None:
+            loaded, compactions, offset = loaded
+            with _journal_lock:
+                if compactions != _journal_stats['compactions']:
+                    self.dropped += 1
+                    return
+                _finish_load(loaded, self.cache_path)
+                _swap_configs(loaded.configs, loaded.overlays, offset)
+            self.reloads += 1
+            return
+        if self._thread is not None and self._thread.is_alive():
+            return
+        signature = self._stat()
+        if signature is None or signature == self.signature:
+            return
+        self.signature = signature
+        with _journal_lock:
+            mark = (_journal_stats['compactions'], _journal_offset())
+        self._thread = threading.Thread(target=self._load, args=mark, name="gear-config-reload")
+        self._thread.daemon = True
+        self._thread.start()
+    
+    def _load(self, compactions, offset):
+        try:
+            self._loaded = (_load_configs(self.path, self.cache_path, offset),
+                             compactions, offset)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+    
+    def stats(self):
+        """Return a dict of reload counters"""
+        return {'reloads': self.reloads, 'dropped': self.dropped, 'errors': self.errors,
+                'last_error': self.last_error,
+                'loading': self._thread is not None and self._thread.is_alive()}
+
+_watcher = ConfigWatcher(gear_config_file, gear_config_cache)
+
+# Bumped by every publish; unlike GearConfig.generation it is never reset
+# by a reload, so subscribers can order deliveries by it
+_change_generation = 0
+
+class ChangeBus:
+    """Batched change notifications for the main gear config
+    
+    Mutations publish the section they touched and the names that changed
+    (category names, worn type names or profile names). Nothing is called
+    right away: names collect per section until dispatch() runs on the next
+    pulse, then each subscriber of a section gets one call,
+    callback(section, generation, names), with a frozenset of every name
+    changed since the last dispatch and the change generation at delivery,
+    which only ever increases.
+    """
+    def __init__(self):
+        self.subscribers = {section: [] for section in CHANGE_SECTIONS}
+        self.pending = {}
+        self.published = 0
+        self.dispatched = 0
+        self.errors = 0
+        self.last_error = None
+    
+    def subscribe(self, section, callback):
+        """Call callback(section, generation, names) after section changes"""
+        if section not in self.subscribers:
+            raise ValueError("unknown gear config section: %s" % section)
+        if callback not in self.subscribers[section]:
+            self.subscribers[section].append(callback)
+    
+    def unsubscribe(self, section, callback):
+        """Stop delivering section changes to callback, returns True if it was subscribed"""
+        callbacks = self.subscribers.get(section, [])
+        if callback not in callbacks:
+            return False
+        callbacks.remove(callback)
+        return True
+    
+    def publish(self, section, names):
+        """Queue names as changed in section until the next dispatch"""
+        global _change_generation
+        _change_generation += 1
+        self.pending.setdefault(section, set()).update(names)
+        self.published += 1
+    
+    def dispatch(self):
+        """Deliver queued changes, returns the number of callbacks made"""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, {}
+        generation = _change_generation
+        calls = 0
+        for section, names in pending.items():
+            names = frozenset(names)
+            for callback in list(self.subscribers.get(section, ())):
+                try:
+                    callback(section, generation, names)
+                except Exception as e:
+                    # One broken subscriber shouldn't starve the others
+                    self.errors += 1
+                    self.last_error = str(e)
+                calls += 1
+        self.dispatched += calls
+        return calls
+    
+    def stats(self):
+        """Return a dict of change bus counters"""
+        return {'published': self.published, 'dispatched': self.dispatched,
+                'generation': _change_generation,
+                'pending': sum(len(names) for names in self.pending.values()),
+                'errors': self.errors, 'last_error': self.last_error,
+                'subscribers': {section: len(callbacks)
+                                for section, callbacks in self.subscribers.items()}}
+
+_change_bus = ChangeBus()
+
+def subscribe_changes(section, callback):
+    """Subscribe to batched changes of a section, see ChangeBus"""
+    _change_bus.subscribe(section, callback)
+
+def unsubscribe_changes(section, callback):
+    """Remove a callback added with subscribe_changes()"""
+    return _change_bus.unsubscribe(section, callback)
+
+def dispatch_changes(owner=None, data=None, arg=None):
+    """Deliver batched change events now; also runs every pulse"""
+    return _change_bus.dispatch()
+
+def get_change_stats():
+    """Get change bus counters: published, dispatched, pending, errors"""
+    return _change_bus.stats()
+
+def gear_config_heartbeat(owner=None, data=None, arg=None):
+    """Periodic update: watch gear_config_file for out-of-band edits"""
+    if _initialized:
+        _watcher.check()
+
+def get_reload_stats():
+    """Get hot reload counters: reloads, dropped, errors, last_error, loading"""
+    return _watcher.stats()
 
 def create_default_gear_config():
     """Create default gear configuration file"""
@@ -232,178 +1309,444 @@ def create_default_gear_config():
     save_gear_configs()
 
 def get_gear_config():
-    """Get main gear config"""
+    """Get main gear config, loading it on first use"""
+    if not _initialized:
+        init_gear_config()
     return gear_configs.get("main", None)
 
+def get_snapshot():
+    """Get an immutable GearSnapshot of the main gear config"""
+    config = get_gear_config()
+    return config.snapshot() if config else _EMPTY_SNAPSHOT
+
+# Profiles: named overlays flattened into cached snapshots. Every change that
+# can alter a flattened view (an edit to any overlay or to main, a profile
+# created or deleted, a reload) bumps _profiles_generation, so a cached view
+# is checked with one comparison instead of a walk up its parents.
+_profile_cache = {}
+_profiles_generation = 0
+
+def _profiles_changed():
+    global _profiles_generation
+    _profiles_generation += 1
+
+def get_profile_snapshot(profile=None):
+    """Get the flattened GearSnapshot for a profile
+    
+    None, "main" or an unknown profile name give the main snapshot. A
+    profile's flattened view is cached until anything it may depend on
+    changes; only then are its parents flattened again.
+    """
+    if profile is None or profile == "main":
+        return get_snapshot()
+    init_gear_config()
+    cached = _profile_cache.get(profile)
+    if cached is not None and cached[0] == _profiles_generation:
+        return cached[1]
+    overlay = gear_overlays.get(profile)
+    if overlay is None:
+        return get_snapshot()
+    snap = GearSnapshot.overlaid(get_profile_snapshot(overlay.parent), overlay)
+    _profile_cache[profile] = (_profiles_generation, snap)
+    return snap
+
+def _check_profile_parents(overlays):
+    """Raise ValueError if any profile is its own ancestor"""
+    for name in overlays:
+        seen = {name}
+        parent = overlays[name].parent
+        while parent in overlays:
+            if parent in seen:
+                raise ValueError("gear profile '%s' has a cyclic parent chain" % name)
+            seen.add(parent)
+            parent = overlays[parent].parent
+
+def create_profile(name, parent="main"):
+    """Create an empty profile over parent, returns False if it can't"""
+    init_gear_config()
+    if name == "main" or name in gear_overlays:
+        return False
+    if parent != "main" and parent not in gear_overlays:
+        return False
+    gear_overlays[name] = GearOverlay(parent)
+    _profiles_changed()
+    _change_bus.publish("profiles", (name,))
+    request_save()
+    return True
+
+def delete_profile(name):
+    """Delete a profile, returns False if it doesn't exist or has children"""
+    init_gear_config()
+    if name not in gear_overlays:
+        return False
+    if any(overlay.parent == name for overlay in gear_overlays.values()):
+        return False
+    del gear_overlays[name]
+    _profile_cache.pop(name, None)
+    _profiles_changed()
+    _change_bus.publish("profiles", (name,))
+    request_save()
+    return True
+
+def get_profiles():
+    """Get a dict of profile name to parent name"""
+    init_gear_config()
+    return {name: overlay.parent for name, overlay in gear_overlays.items()}
+
+def _edit_profile(name, method, path, item):
+    init_gear_config()
+    overlay = gear_overlays.get(name)
+    if overlay is None:
+        return False
+    try:
+        _resolve_category(get_gear_config(), path)
+    except (KeyError, ValueError):
+        return False
+    if not getattr(overlay, method)(path, item):
+        return False
+    _change_bus.publish("profiles", (name,))
+    request_save()
+    return True
+
+def add_profile_item(name, path, item):
+    """Add item to the 'section.category' path for one profile only"""
+    return _edit_profile(name, "add_item", path, item)
+
+def remove_profile_item(name, path, item):
+    """Hide an inherited item at the 'section.category' path for one profile"""
+    return _edit_profile(name, "remove_item", path, item)
+
+def reset_profile_item(name, path, item):
+    """Drop a profile's override of item so it is inherited again"""
+    return _edit_profile(name, "reset_item", path, item)
+
+def _resolve_category(config, path):
+    """Return the GearCategory for a 'section.category' path"""
+    section, name = path.split(".")
+    if section == "wielded" and name in WIELDED_CATEGORIES:
+        return getattr(config.wielded, name)
+    if section == "equipped" and name in EQUIPPED_CATEGORIES:
+        return getattr(config.equipped, name)
+    raise KeyError(path)
+
+def _add_category_item(path, item):
+    """Add an item to a main config category, journaling the change"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.add_item(path, item)
+    config = get_gear_config()
+    if not config or not _resolve_category(config, path).addItem(item):
+        return False
+    _journal({"op": "add", "path": path, "item": item})
+    return True
+
+def _remove_category_item(path, item):
+    """Remove an item from a main config category, journaling the change"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.remove_item(path, item)
+    config = get_gear_config()
+    if not config or not _resolve_category(config, path).removeItem(item):
+        return False
+    _journal({"op": "remove", "path": path, "item": item})
+    return True
+
+# Transactions
+_active_transaction = None
+
+class GearConfigTransaction:
+    """A batch of staged gear config edits
+    
+    Edits are recorded, not applied, until commit(). commit() validates
+    the whole batch against the state it would produce, applies it, then
+    persists it with one journal append (or one scheduled save) and pushes
+    only the worn types whose positions actually changed to C. If applying
+    fails part way, the config is restored to its state before the commit.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.records = []
+        self._staged_worn = {}
+        self._depth = 0
+    
+    def is_main(self):
+        """Check whether this transaction edits the main gear config"""
+        return gear_configs.get("main") is self.config
+    
+    def __enter__(self):
+        global _active_transaction
+        if self._depth == 0 and _active_transaction is None:
+            _active_transaction = self
+        self._depth += 1
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _active_transaction
+        self._depth -= 1
+        if self._depth > 0:
+            return False
+        if _active_transaction is self:
+            _active_transaction = None
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+    
+    def add_item(self, path, item):
+        """Stage adding item to the 'section.category' path"""
+        self.records.append({"op": "add", "path": path, "item": item})
+        return True
+    
+    def remove_item(self, path, item):
+        """Stage removing item from the 'section.category' path"""
+        self.records.append({"op": "remove", "path": path, "item": item})
+        return True
+    
+    def add_worn_type(self, name, positions):
+        """Stage a new worn type"""
+        self.records.append({"op": "worn_add", "name": name, "positions": list(positions)})
+        self._staged_worn[name] = True
+        return True
+    
+    def remove_worn_type(self, name):
+        """Stage removing a (non built-in) worn type"""
+        self.records.append({"op": "worn_remove", "name": name})
+        self._staged_worn[name] = False
+        return True
+    
+    def _worn_type_staged(self, name):
+        """Whether worn type name will exist once the staged edits apply"""
+        return self._staged_worn.get(name, name in self.config.worn_types.worn_types)
+    
+    def update_worn_type_positions(self, name, positions):
+        """Stage new positions for an existing worn type, False if it will not exist"""
+        if not self._worn_type_staged(name):
+            return False
+        self.records.append({"op": "worn_update", "name": name, "positions": list(positions)})
+        return True
+    
+    def set_worn_type_positions(self, name, positions):
+        """Stage new positions for a worn type, adding it if it will not exist"""
+        if not self._worn_type_staged(name):
+            return self.add_worn_type(name, positions)
+        return self.update_worn_type_positions(name, positions)
+    
+    def validate(self):
+        """Return a list of problems with the staged edits, empty if none"""
+        errors = []
+        worn_types = self.config.worn_types.worn_types
+        exists = {name: True for name in worn_types}
+        for record in self.records:
+            op = record["op"]
+            if op in ("add", "remove"):
+                try:
+                    _resolve_category(self.config, record["path"])
+                except (KeyError, ValueError):
+                    errors.append("unknown category '%s'" % record["path"])
+                if not isinstance(record["item"], str) or not record["item"].strip():
+                    errors.append("empty item for '%s'" % record["path"])
+                continue
+            
+            name = record["name"]
+            if not isinstance(name, str) or not name.strip():
+                errors.append("empty worn type name")
+            elif op == "worn_add":
+                if exists.get(name):
+                    errors.append("worn type '%s' already exists" % name)
+                exists[name] = True
+            elif op == "worn_remove":
+                if not exists.get(name):
+                    errors.append("worn type '%s' does not exist" % name)
+                elif name in worn_types and worn_types[name].builtin:
+                    errors.append("worn type '%s' is built-in" % name)
+                exists[name] = False
+            elif op == "worn_update":
+                if not exists.get(name):
+                    errors.append("worn type '%s' does not exist" % name)
+        return errors
+    
+    def commit(self):
+        """Validate and apply every staged edit, raises ValueError if invalid
+        
+        Returns the number of edits that changed the config.
+        """
+        errors = self.validate()
+        records = self.records
+        self.rollback()
+        if errors:
+            raise ValueError("gear config transaction rejected: " + "; ".join(errors))
+        if not records:
+            return 0
+        
+        config = self.config
+        touched = set(record["name"] for record in records if "name" in record)
+        before = config.to_plain()
+        changed = []
+        try:
+            for record in records:
+                if _apply_record(config, record):
+                    changed.append(record)
+        except:
+            config.restore_plain(before)
+            raise
+        if not changed:
+            return 0
+        
+        # One journal append or save for the whole batch
+        if self.is_main() and JOURNAL_ENABLED:
+            _append_journal(changed)
+        elif self.is_main() or config in gear_configs.values():
+            request_save()
+        
+        # One resync with the C worn system, for net changes only
+        if touched and self.is_main():
+            _worn_sync.reconcile(config, touched)
+        return len(changed)
+    
+    def rollback(self):
+        """Discard every staged edit"""
+        self.records = []
+        self._staged_worn = {}
+
+def transaction():
+    """Return a transaction on the main gear config, see GearConfig.transaction()"""
+    return get_gear_config().transaction()
+
 # Helper functions for backward compatibility
-def get_damage_types():
-    """Get list of damage types"""
-    config = gear_configs.get("main")
-    if config:
-        return config.wielded.damage_types.getItems()
-    return []
+def get_damage_types(profile=None):
+    """Get tuple of damage types"""
+    return get_profile_snapshot(profile).wielded.damage_types
 
 def add_damage_type(damage_type):
     """Add a damage type"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.damage_types.addItem(damage_type)
+    return _add_category_item("wielded.damage_types", damage_type)
 
 def remove_damage_type(damage_type):
     """Remove a damage type"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.damage_types.removeItem(damage_type)
+    return _remove_category_item("wielded.damage_types", damage_type)
 
-def get_weapon_categories():
-    config = get_gear_config()
-    return config.wielded.weapon_categories.getItems() if config else []
+def get_weapon_categories(profile=None):
+    return get_profile_snapshot(profile).wielded.weapon_categories
 
-def get_ranged_types():
-    config = get_gear_config()
-    return config.wielded.ranged_types.getItems() if config else []
+def get_ranged_types(profile=None):
+    return get_profile_snapshot(profile).wielded.ranged_types
 
-def get_wielded_materials():
-    config = get_gear_config()
-    return config.wielded.materials.getItems() if config else []
+def get_wielded_materials(profile=None):
+    return get_profile_snapshot(profile).wielded.materials
 
-def get_wielded_special_properties():
-    config = get_gear_config()
-    return config.wielded.special_properties.getItems() if config else []
+def get_wielded_special_properties(profile=None):
+    return get_profile_snapshot(profile).wielded.special_properties
 
-def get_wielded_special_attacks():
-    config = get_gear_config()
-    return config.wielded.special_attacks.getItems() if config else []
+def get_wielded_special_attacks(profile=None):
+    return get_profile_snapshot(profile).wielded.special_attacks
 
-def get_equipped_types():
-    config = get_gear_config()
-    return config.equipped.armor_types.getItems() if config else []
+def get_equipped_types(profile=None):
+    return get_profile_snapshot(profile).equipped.armor_types
 
-def get_equipped_materials():
-    config = get_gear_config()
-    return config.equipped.materials.getItems() if config else []
+def get_equipped_materials(profile=None):
+    return get_profile_snapshot(profile).equipped.materials
 
-def get_equipped_special_properties():
-    config = get_gear_config()
-    return config.equipped.special_properties.getItems() if config else []
+def get_equipped_special_properties(profile=None):
+    return get_profile_snapshot(profile).equipped.special_properties
 
 def add_wielded_material(material):
     """Add a wielded material"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.materials.addItem(material)
+    return _add_category_item("wielded.materials", material)
 
 def remove_wielded_material(material):
     """Remove a wielded material"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.materials.removeItem(material)
+    return _remove_category_item("wielded.materials", material)
 
 def add_wielded_special_property(prop):
     """Add a wielded special property"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.special_properties.addItem(prop)
+    return _add_category_item("wielded.special_properties", prop)
 
 def remove_wielded_special_property(prop):
     """Remove a wielded special property"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.special_properties.removeItem(prop)
+    return _remove_category_item("wielded.special_properties", prop)
 
 def add_wielded_special_attack(attack):
     """Add a wielded special attack"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.special_attacks.addItem(attack)
+    return _add_category_item("wielded.special_attacks", attack)
 
 def remove_wielded_special_attack(attack):
     """Remove a wielded special attack"""
-    config = gear_configs.get("main")
-    if config:
-        config.wielded.special_attacks.removeItem(attack)
+    return _remove_category_item("wielded.special_attacks", attack)
 
 def add_equipped_type(equipped_type):
     """Add an equipped type"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.armor_types.addItem(equipped_type)
+    return _add_category_item("equipped.armor_types", equipped_type)
 
 def remove_equipped_type(equipped_type):
     """Remove an equipped type"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.armor_types.removeItem(equipped_type)
+    return _remove_category_item("equipped.armor_types", equipped_type)
 
 def add_equipped_material(material):
     """Add an equipped material"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.materials.addItem(material)
+    return _add_category_item("equipped.materials", material)
 
 def remove_equipped_material(material):
     """Remove an equipped material"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.materials.removeItem(material)
+    return _remove_category_item("equipped.materials", material)
 
 def add_equipped_special_property(prop):
     """Add an equipped special property"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.special_properties.addItem(prop)
+    return _add_category_item("equipped.special_properties", prop)
 
 def remove_equipped_special_property(prop):
     """Remove an equipped special property"""
-    config = gear_configs.get("main")
-    if config:
-        config.equipped.special_properties.removeItem(prop)
+    return _remove_category_item("equipped.special_properties", prop)
 
 
 # Validation functions for gear_olc.py
-def is_valid_damage_type(damage_type):
+def _category_contains(section, category, item, profile=None):
+    """Constant-time membership test against a config or profile category"""
+    if profile is not None and profile != "main":
+        return get_profile_snapshot(profile).contains(section + "." + category, item)
+    config = get_gear_config()
+    if not config:
+        return False
+    return getattr(getattr(config, section), category).contains(item)
+
+def is_valid_damage_type(damage_type, profile=None):
     """Check if damage type is valid"""
-    return damage_type in get_damage_types()
+    return _category_contains("wielded", "damage_types", damage_type, profile)
 
-def is_valid_weapon_category(category):
+def is_valid_weapon_category(category, profile=None):
     """Check if weapon category is valid"""
-    return category in get_weapon_categories()
+    return _category_contains("wielded", "weapon_categories", category, profile)
 
-def is_valid_ranged_type(ranged_type):
+def is_valid_ranged_type(ranged_type, profile=None):
     """Check if ranged type is valid"""
-    return ranged_type in get_ranged_types()
+    return _category_contains("wielded", "ranged_types", ranged_type, profile)
 
-def is_valid_wielded_material(material):
+def is_valid_wielded_material(material, profile=None):
     """Check if wielded material is valid"""
-    return material in get_wielded_materials()
+    return _category_contains("wielded", "materials", material, profile)
 
-def is_valid_equipped_material(material):
+def is_valid_equipped_material(material, profile=None):
     """Check if equipped material is valid"""
-    return material in get_equipped_materials()
+    return _category_contains("equipped", "materials", material, profile)
 
-def is_valid_wielded_special_property(prop):
+def is_valid_wielded_special_property(prop, profile=None):
     """Check if wielded special property is valid"""
-    return prop in get_wielded_special_properties()
+    return _category_contains("wielded", "special_properties", prop, profile)
 
-def is_valid_wielded_special_attack(attack):
+def is_valid_wielded_special_attack(attack, profile=None):
     """Check if wielded special attack is valid"""
-    return attack in get_wielded_special_attacks()
+    return _category_contains("wielded", "special_attacks", attack, profile)
 
-def is_valid_equipped_special_property(prop):
+def is_valid_equipped_special_property(prop, profile=None):
     """Check if equipped special property is valid"""
-    return prop in get_equipped_special_properties()
+    return _category_contains("equipped", "special_properties", prop, profile)
 
 # Worn types helper functions
 def get_worn_types():
-    """Get list of all worn type names"""
-    config = get_gear_config()
-    if not config:
-        return []
-    return list(config.worn_types.worn_types.keys())
+    """Get tuple of all worn type names"""
+    return get_snapshot().worn_type_names
 
 def get_worn_type_count():
     """Get the total number of worn types"""
-    return len(get_worn_types())
+    return len(get_snapshot().worn_types)
 
 def get_worn_type_object(worn_type):
     """Get a worn type object for OLC editing"""
@@ -412,14 +1755,12 @@ def get_worn_type_object(worn_type):
     return None
 
 def set_worn_type_positions(worn_type, positions):
-    """Set positions for a worn type"""
-    try:
-        # Remove existing worn type
-        remove_worn_type(worn_type)
-        # Add it back with new positions
-        return add_worn_type(worn_type, positions)
-    except:
-        return False
+    """Set positions for a worn type, creating it if it does not exist"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.set_worn_type_positions(worn_type, positions)
+    if worn_type_exists(worn_type):
+        return update_worn_type_positions(worn_type, positions)
+    return add_worn_type(worn_type, positions)
 
 def get_available_body_positions():
     """Get list of available body positions"""
@@ -431,30 +1772,65 @@ def get_available_body_positions():
     ]
 
 def get_worn_type_positions(worn_type_name):
-    """Get positions for a specific worn type"""
+    """Get tuple of positions for a specific worn type"""
+    return get_snapshot().worn_types.get(worn_type_name, ())
+
+def get_worn_types_at_position(position):
+    """Get tuple of worn type names that occupy a body position"""
+    config = get_gear_config()
+    return config.worn_types.users_of(position) if config else ()
+
+def get_conflicting_worn_types(worn_type_name):
+    """Get tuple of other worn types sharing a body position with worn_type_name"""
     config = get_gear_config()
     if not config:
-        return []
+        return ()
     worn_type = config.worn_types.worn_types.get(worn_type_name)
-    return worn_type.positions if worn_type else []
+    if worn_type is None:
+        return ()
+    conflicts = {}
+    for position in worn_type.positions:
+        for name in config.worn_types.by_position.get(position, ()):
+            if name != worn_type_name:
+                conflicts[name] = None
+    return tuple(conflicts)
+
+def get_used_body_positions():
+    """Get tuple of body positions used by at least one worn type"""
+    config = get_gear_config()
+    return tuple(config.worn_types.by_position) if config else ()
+
+def get_item_categories(item):
+    """Get tuple of 'section.category' paths that contain item
+    
+    For example get_item_categories("steel") gives
+    ('wielded.materials', 'equipped.materials').
+    """
+    config = get_gear_config()
+    return config.paths_of(item) if config else ()
+
+def get_material_categories(material):
+    """Get tuple of material category paths that contain material"""
+    return tuple(path for path in get_item_categories(material)
+                 if path.endswith(".materials"))
 
 def worn_type_exists(worn_type_name):
     """Check if a worn type exists"""
     config = get_gear_config()
-    if not config:
-        return False
-    return worn_type_name in config.worn_types.worn_types
+    return config is not None and worn_type_name in config.worn_types.worn_types
 
 def is_builtin_worn_type(worn_type_name):
     """Check if a worn type is built-in (cannot be deleted)"""
     config = get_gear_config()
-    if not config:
+    if config is None:
         return False
     worn_type = config.worn_types.worn_types.get(worn_type_name)
-    return worn_type.builtin if worn_type else False
+    return worn_type is not None and worn_type.builtin
 
 def add_worn_type(worn_type_name, positions):
     """Add a new worn type with specified positions"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.add_worn_type(worn_type_name, positions)
     config = get_gear_config()
     if not config:
         return False
@@ -463,23 +1839,19 @@ def add_worn_type(worn_type_name, positions):
         return False
     
     # Create new worn type
-    worn_type = WornType(worn_type_name, positions, False)
-    config.worn_types.worn_types[worn_type_name] = worn_type
+    worn_type = WornType(worn_type_name, list(positions), False)
+    config.worn_types.add(worn_type)
     
     # Register with C system
-    try:
-        import mudsys
-        positions_str = ",".join(positions) if positions else ""
-        mudsys.add_worn_type(worn_type_name, positions_str)
-    except:
-        pass
+    _worn_sync.reconcile(config, (worn_type_name,))
     
-    # Save configuration
-    save_gear_configs()
+    _journal({"op": "worn_add", "name": worn_type_name, "positions": list(positions)}, save=True)
     return True
 
 def remove_worn_type(worn_type_name):
     """Remove a worn type (only if not built-in)"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.remove_worn_type(worn_type_name)
     config = get_gear_config()
     if not config:
         return False
@@ -491,43 +1863,33 @@ def remove_worn_type(worn_type_name):
         return False
     
     # Remove from configuration
-    del config.worn_types.worn_types[worn_type_name]
+    config.worn_types.remove(worn_type_name)
     
     # Remove from C system
-    try:
-        import mudsys
-        mudsys.remove_worn_type(worn_type_name)
-    except:
-        pass
+    _worn_sync.reconcile(config, (worn_type_name,))
     
-    # Save configuration
-    save_gear_configs()
+    _journal({"op": "worn_remove", "name": worn_type_name}, save=True)
     return True
 
 def update_worn_type_positions(worn_type_name, positions):
     """Update positions for an existing worn type"""
+    if _active_transaction is not None and _active_transaction.is_main():
+        return _active_transaction.update_worn_type_positions(worn_type_name, positions)
     config = get_gear_config()
     if not config:
         return False
     
-    worn_type = config.worn_types.worn_types.get(worn_type_name)
-    if not worn_type:
+    # Update positions; nothing to save or resync if they did not change
+    generation = config.worn_types.generation
+    if not config.worn_types.set_positions(worn_type_name, positions):
         return False
-    
-    # Update positions
-    worn_type.positions = positions
+    if config.worn_types.generation == generation:
+        return True
     
     # Update C system
-    try:
-        import mudsys
-        mudsys.remove_worn_type(worn_type_name)
-        positions_str = ",".join(positions) if positions else ""
-        mudsys.add_worn_type(worn_type_name, positions_str)
-    except:
-        pass
+    _worn_sync.reconcile(config, (worn_type_name,))
     
-    # Save configuration
-    save_gear_configs()
+    _journal({"op": "worn_update", "name": worn_type_name, "positions": list(positions)}, save=True)
     return True
 
 def get_available_body_positions():
@@ -544,28 +1906,220 @@ def get_available_body_positions():
             "tail", "held", "hands", "legs", "feet", "wings", "hooves"
         ]
 
+class WornTypeSync:
+    """Keeps the C worn system in step with the gear config
+    
+    ``sent`` remembers the positions last pushed for each worn type, which
+    is our fingerprint of what C already holds. reconcile() diffs a config
+    against it and sends only additions, removals and position changes.
+    A full reconcile of a WornTypes object whose generation has not moved
+    since the last clean reconcile is skipped outright.
+    """
+    def __init__(self):
+        self.sent = {}
+        self.fingerprint = None
+        self.totals = {'reconciles': 0, 'added': 0, 'removed': 0,
+                       'updated': 0, 'unchanged': 0, 'failed': 0}
+        self.last_report = None
+    
+    def reconcile(self, config, names=None):
+        """Push worn type differences for config to C
+        
+        With names, only those worn types are compared. Returns a report
+        dict with added/removed/updated/unchanged/failed counts and a
+        failures list of (name, error) pairs.
+        """
+        report = {'added': 0, 'removed': 0, 'updated': 0, 'unchanged': 0,
+                  'failed': 0, 'failures': []}
+        worn_types = config.worn_types.worn_types
+        fingerprint = (id(config.worn_types), config.worn_types.generation)
+        if names is None:
+            if fingerprint == self.fingerprint:
+                report['unchanged'] = len(self.sent)
+                return self._finish(report)
+            names = set(self.sent).union(worn_types)
+        
+        import mudsys
+        for name in names:
+            worn_type = worn_types.get(name)
+            desired = tuple(worn_type.positions) if worn_type is not None else None
+            current = self.sent.get(name)
+            if desired == current:
+                report['unchanged'] += 1
+                continue
+            try:
+                if current is not None:
+                    mudsys.remove_worn_type(name)
+                if desired is not None:
+                    mudsys.add_worn_type(name, ",".join(desired))
+            except Exception as e:
+                report['failed'] += 1
+                report['failures'].append((name, str(e)))
+                if worn_type is not None and worn_type.builtin:
+                    # C defines its built-ins itself; don't retry them
+                    self.sent[name] = desired
+                else:
+                    # Unknown C state, retry on the next full reconcile
+                    self.sent.pop(name, None)
+                continue
+            if desired is None:
+                del self.sent[name]
+                report['removed'] += 1
+            else:
+                self.sent[name] = desired
+                report['added' if current is None else 'updated'] += 1
+        
+        if report['failed'] or len(names) < len(worn_types):
+            self.fingerprint = None
+        else:
+            self.fingerprint = fingerprint
+        return self._finish(report)
+    
+    def _finish(self, report):
+        self.totals['reconciles'] += 1
+        for key in ('added', 'removed', 'updated', 'unchanged', 'failed'):
+            self.totals[key] += report[key]
+        self.last_report = report
+        return report
+
+_worn_sync = WornTypeSync()
+
+@_timed("register")
 def register_worn_types_with_c():
-    """Register all worn types with the C worn system during module initialization"""
+    """Reconcile the C worn system with the main config's worn types
+    
+    Returns the reconcile report, or None if there is no config.
+    """
     config = get_gear_config()
     if not config:
-        return
+        return None
+    return _worn_sync.reconcile(config)
+
+def _cached_worn_types():
+    """Main config's WornTypes from the sidecar and journal, None on a miss
+    
+    Only the worn types are built and only worn type records replayed, so
+    this costs a marshal load rather than a parse of gear_config_file.
+    """
+    try:
+        with open(gear_config_cache, "rb") as fl:
+            data = marshal.loads(fl.read())
+        if (data["version"] != CONFIG_CACHE_VERSION or
+                tuple(data["key"]) != _config_cache_key(gear_config_file)):
+            return None
+        main = types.SimpleNamespace(worn_types=WornTypes(plain=data["configs"]["main"]["worn_types"]))
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None
+    if os.path.exists(gear_config_journal):
+        with open(gear_config_journal, "rb") as fl:
+            lines = fl.read().decode("utf-8", "replace").splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+                if record.get("key", "main") == "main" and record["op"].startswith("worn_"):
+                    _apply_record(main, record)
+            except (ValueError, KeyError, AttributeError, TypeError):
+                continue
+    return main.worn_types
+
+def register_boot_worn_types():
+    """Register worn types with C at boot, leaving the full load deferred
+    
+    The worn types come from the compiled sidecar when it matches
+    gear_config_file. Without a current sidecar the whole config is
+    loaded now instead, since C needs its worn types before the world
+    loads and equips anything. Returns the reconcile report.
+    """
+    start = time.perf_counter()
+    worn_types = _cached_worn_types()
+    if worn_types is None:
+        init_gear_config()
+        return _worn_sync.last_report
+    report = _worn_sync.reconcile(types.SimpleNamespace(worn_types=worn_types))
+    _init_times.append(("gear_config boot worn types", time.perf_counter() - start))
+    return report
+
+def get_worn_sync_stats():
+    """Get cumulative worn type sync counters and the last report"""
+    stats = dict(_worn_sync.totals)
+    stats['last_report'] = _worn_sync.last_report
+    return stats
+
+# Deferred initialization: the config file is parsed the first time anything
+# asks for the config. The package calls register_boot_worn_types() at boot,
+# so C has the worn types before the world loads and equips anything
+_initialized = False
+_initializing = False
+_init_lock = threading.RLock()
+_init_times = []
+
+def init_gear_config():
+    """Load gear configs and register worn types with C, once
     
-    registered_count = 0
-    for worn_type in config.worn_types.worn_types.values():
+    Called automatically by get_gear_config(); safe to call directly to
+    warm the config at a convenient time. If the load raises, the config
+    stays uninitialized and the next call tries again.
+    """
+    global _initialized, _initializing
+    if _initialized:
+        return
+    with _init_lock:
+        # The loaders use the public accessors, which land back here
+        if _initialized or _initializing:
+            return
+        _initializing = True
         try:
-            import mudsys
-            # Convert positions list to comma-separated string for C function
-            positions_str = ",".join(worn_type.positions) if worn_type.positions else ""
-            mudsys.add_worn_type(worn_type.name, positions_str)
-            registered_count += 1
-        except Exception as e:
-            # Type might already exist, which is fine
-            pass
+            start = time.perf_counter()
+            load_gear_configs()
+            loaded = time.perf_counter()
+            register_worn_types_with_c()
+            _initialized = True
+        finally:
+            _initializing = False
+        _init_times.append(("gear_config load", loaded - start))
+        _init_times.append(("gear_config register worn types", time.perf_counter() - loaded))
+
+def get_gear_config_stats():
+    """Get one dict of gear config instrumentation
     
-    if registered_count > 0:
-        pass
+    'operations' has calls, errors and total/last/max/mean seconds for
+    load, save, register and reload. 'bytes_written' counts bytes per
+    file since boot and 'items' gives the size of every category of the
+    main config. The save, journal, reload, change and worn sync counters
+    are included under their own keys.
+    """
+    items = {}
+    config = gear_configs.get("main")
+    if config is not None:
+        for section, name, category in config.categories():
+            items[section + "." + name] = len(category)
+        items['worn_types'] = len(config.worn_types.worn_types)
+    items['profiles'] = len(gear_overlays)
+    return {
+        'initialized': _initialized,
+        'operations': {name: op.as_dict() for name, op in _op_stats.items()},
+        'bytes_written': dict(_bytes_written),
+        'items': items,
+        'save': get_save_stats(),
+        'journal': get_journal_stats(),
+        'reload': get_reload_stats(),
+        'changes': get_change_stats(),
+        'worn_sync': get_worn_sync_stats(),
+    }
+
+def is_initialized():
+    """Check whether the gear config has been loaded yet"""
+    return _initialized
+
+def get_init_times():
+    """Get (stage, seconds) pairs for boot worn types and the deferred load"""
+    return list(_init_times)
 
-# Initialize on module load
-load_gear_configs()
-# Register worn types with C system after loading
-register_worn_types_with_c()
+# Make sure scheduled saves reach disk before the MUD goes down
+hooks.add("shutdown", flush_pending_save)
+# Write coalesced saves on the main thread once their edits settle
+event.start_update(None, SAVE_CHECK_INTERVAL, save_heartbeat)
+# Watch for out-of-band edits to the config file
+event.start_update(None, HOT_RELOAD_INTERVAL, gear_config_heartbeat)
+# Deliver batched change notifications once per pulse
+event.start_update(None, CHANGE_DISPATCH_INTERVAL, dispatch_changes)
@@ -576,6 +576,9 @@ def worn_types_parser(sock, data, choice, arg):
             if positions:
                 builtin_marker = " (built-in)" if gear_config.is_builtin_worn_type(worn_type) else ""
                 sock.send_raw("Positions for '%s'%s: %s\n" % (worn_type, builtin_marker, ", ".join(positions)))
+                conflicts = gear_config.get_conflicting_worn_types(worn_type)
+                if conflicts:
+                    sock.send_raw("Shares positions with: %s\n" % ", ".join(conflicts))
             else:
                 sock.send_raw("Worn type '%s' has no positions defined.\n" % worn_type)
         return True
@@ -658,7 +661,7 @@ def worn_type_edit_parser(sock, worn_type_obj, choice, arg):
             return True
             
         # Add the position
-        new_positions = current_positions + [position]
+        new_positions = list(current_positions) + [position]
         if gear_config.set_worn_type_positions(worn_type, new_positions):
             sock.send_raw("Added position '%s' to worn type '%s'.\n" % (position, worn_type))
         else:
@@ -678,6 +681,9 @@ def worn_type_edit_parser(sock, worn_type_obj, choice, arg):
         new_positions = [p for p in current_positions if p != position]
         if gear_config.set_worn_type_positions(worn_type, new_positions):
             sock.send_raw("Removed position '%s' from worn type '%s'.\n" % (position, worn_type))
+            others = gear_config.get_worn_types_at_position(position)
+            if others:
+                sock.send_raw("Position '%s' is still used by: %s\n" % (position, ", ".join(others)))
         else:
             sock.send_raw("Failed to remove position '%s'.\n" % position)
         return True
@@ -0,0 +1,428 @@
+"""
+gear_data.py
+
+Shared building blocks for the wielded and equipped item data classes.
+
+Each class is described by a schema, a tuple of GearField entries. From it
+gear_fields() builds the field properties and compiles the class's loader,
+storers and OLC prototype writer once at import, and parse_field() turns
+OLC input into field values.
+"""
+import bisect
+import collections
+import functools
+import storage
+from . import gear_config
+
+# Write only the fields that differ from their defaults. Loading doesn't
+# depend on this: a key missing from a set always reads as the default, so
+# sparse and full sets load the same. Set False to write every field.
+SPARSE_STORAGE = True
+
+# Keep a reference to the StorageSet an item was loaded from and decode
+# each field on first access instead of all at once. Opt-in: the set must
+# stay valid for as long as the item may read from it or store() it. Items
+# entering the game decode their numeric fields right away, when the gear
+# registry mirrors them, so the saving is mostly for items kept out of it.
+LAZY_LOADING = False
+
+# Placeholder in _values for a field not yet read from the source set
+_UNDECODED = object()
+
+# One schema entry. kind is the StorageSet kind ("String", "Int", "Double",
+# "Bool"); range is an inclusive (low, high) for OLC input, either bound
+# may name another field; validator(text) returns the value OLC input
+# stands for or raises ValueError with a message for the builder.
+GearField = collections.namedtuple("GearField", "name kind default range validator",
+                                   defaults=(None, None))
+
+# Storage kind -> (StorageSet reader, StorageSet writer)
+_STORAGE_METHODS = {
+    "String": ("readString", "storeString"),
+    "Int": ("readInt", "storeInt"),
+    "Double": ("readDouble", "storeDouble"),
+    "Bool": ("readBool", "storeBool"),
+}
+
+# Storage kind -> OLC input conversion and prototype value format
+_INPUT_TYPES = {"String": str.strip, "Int": int, "Double": float, "Bool": bool}
+_PROTO_FORMATS = {"String": '"%s"', "Int": "%d", "Double": "%.1f", "Bool": "%s"}
+
+# (lowest durability percentage, condition), ascending; see set_condition_table()
+CONDITION_TABLE = (
+    (0, "nearly broken"),
+    (5, "in poor condition"),
+    (20, "badly worn"),
+    (35, "well worn"),
+    (50, "showing some wear"),
+    (65, "in good condition"),
+    (80, "in excellent condition"),
+    (95, "in perfect condition"),
+)
+
+# Condition text and look suffix for every whole percentage 0-100
+_conditions = ()
+_condition_suffixes = ()
+
+def set_condition_table(table):
+    """Replace the durability condition thresholds
+    
+    table is a sequence of (lowest percentage, condition) pairs with
+    strictly ascending percentages, the first of them 0. Percentages are
+    bucketed once here, so lookups are a single index.
+    """
+    global CONDITION_TABLE, _conditions, _condition_suffixes
+    table = tuple((int(low), str(name)) for low, name in table)
+    bounds = [low for low, _name in table]
+    if not table or bounds[0] != 0 or any(a >= b for a, b in zip(bounds, bounds[1:])):
+        raise ValueError("condition thresholds must ascend from 0")
+    CONDITION_TABLE = table
+    _conditions = tuple(table[bisect.bisect_right(bounds, percent) - 1][1]
+                        for percent in range(101))
+    _condition_suffixes = tuple(" It is %s." % name for name in _conditions)
+
+set_condition_table(CONDITION_TABLE)
+
+def _condition_bucket(durability, max_durability):
+    return min(max((durability * 100) // max_durability, 0), 100)
+
+def durability_condition(durability, max_durability):
+    """Condition text for a durability, e.g. 'badly worn'"""
+    if max_durability <= 0:
+        return "broken"
+    return _conditions[_condition_bucket(durability, max_durability)]
+
+def condition_suffix(data):
+    """' It is <condition>.' for data's durability, '' without a max durability"""
+    if data.max_durability <= 0:
+        return ""
+    return _condition_suffixes[_condition_bucket(data.durability, data.max_durability)]
+
+@functools.lru_cache(maxsize=1024)
+def parse_properties(text):
+    """Parse a comma-separated property string into a frozenset
+    
+    Names are stripped and lowercased and blanks dropped. Results are
+    cached by string, so items sharing a property string share one set.
+    """
+    return frozenset(p.strip().lower() for p in text.split(',') if p.strip())
+
+def gear_fields(fields, interned=(), parsed=None):
+    """Class decorator generating copy-on-write field properties
+    
+    fields is the class's GearField schema. Fresh instances and copies
+    share a tuple of values in _values, indexed in table order: the class
+    defaults, or the tuple of the object they were copied from. An object
+    that owns its values, after its first write or a load, keeps them in
+    named slots instead (an underscore and the field name) and sets
+    _values to None, so owning costs no container beyond the instance.
+    Copying an owned object freezes its slots into one tuple it shares
+    with every copy until its next write. Fields named in interned are
+    passed through gear_config.intern_value() on write. parsed maps a
+    string field to the name of a read-only frozenset view,
+    parse_properties() of the string, stored alongside it and updated on
+    every write.
+    
+    With LAZY_LOADING, load_fields() leaves every value undecoded and keeps
+    the source set in _source: a read decodes just that field, the first
+    write or copy decodes them all and drops the source, and
+    store_fields() returns a copy of the untouched source's keys without
+    decoding the item.
+    
+    Every write through a field setter, and every copy onto an object, is
+    reported to the class's field listener if one is set; see
+    set_field_listener().
+    
+    The class must declare '_values' and '_source' slots; like
+    dataclass(slots=True), the decorator returns a new class with a slot
+    per field added. Adds _DEFAULTS, the shared defaults tuple,
+    _FIELD_INDEX, name -> position in _values, _SLOTS, the slot
+    descriptors in the same order, and the compiled _load_fields,
+    _store_sparse, _store_full and _to_proto methods behind load_fields(),
+    store_fields() and to_proto(), plus _copy_source, which copies the
+    schema keys of a lazily loaded item's source set as stored.
+    """
+    parsed = parsed or {}
+    def decorate(cls):
+        names = [field.name for field in fields] + list(parsed.values())
+        slots = tuple("_" + name for name in names)
+        body = dict(cls.__dict__)
+        for name in tuple(cls.__slots__) + ("__dict__", "__weakref__"):
+            body.pop(name, None)
+        body["__slots__"] = tuple(cls.__slots__) + slots
+        cls = type(cls)(cls.__name__, cls.__bases__, body)
+        cls._SLOTS = tuple(cls.__dict__[slot] for slot in slots)
+        cls._FIELD_INDEX = {name: i for i, name in enumerate(names)}
+        defaults = [field.default for field in fields]
+        defaults += [parse_properties(defaults[cls._FIELD_INDEX[name]]) for name in parsed]
+        cls._DEFAULTS = tuple(defaults)
+        cls._FIELDS = fields
+        cls._INTERNED = frozenset(cls._FIELD_INDEX[name] for name in interned)
+        cls._PARSED_FROM = {cls._FIELD_INDEX[set_name]: cls._FIELD_INDEX[name]
+                            for name, set_name in parsed.items()}
+        cls._UNDECODED_VALUES = (_UNDECODED,) * len(names)
+        cls._listener = None
+        for name, index in cls._FIELD_INDEX.items():
+            if name in parsed.values():
+                setter = None
+            elif name in parsed:
+                set_index = cls._FIELD_INDEX[parsed[name]]
+                setter = _parsed_setter(name, cls._SLOTS[index], cls._SLOTS[set_index])
+            else:
+                setter = _field_setter(name, cls._SLOTS[index], name in interned)
+            setattr(cls, name, property(_field_getter(index, cls._SLOTS[index]), setter))
+        _compile_schema(cls, fields, set(interned) | set(parsed))
+        return cls
+    return decorate
+
+def _compile_schema(cls, fields, interned):
+    """Generate the straight-line loader, storers and proto writer of cls
+    
+    Each is one function with a statement per field and every name, kind
+    and default written in, so none of them loops over the schema or looks
+    up storage methods at run time. The loader writes the field slots
+    directly; the storers read the shared tuple, or the slots when the
+    object owns its values.
+    """
+    owned = "(%s,)" % ", ".join("data._" + field.name for field in fields)
+    load = ["def _load_fields(data, set_data):",
+            "    contains = set_data.contains"]
+    sparse = ["def _store_sparse(data):",
+              "    values = data._values",
+              "    if values is None:",
+              "        values = " + owned,
+              "    set_data = StorageSet()"]
+    full = ["def _store_full(data):"] + sparse[1:]
+    proto = ["def _to_proto(data):",
+             "    lines = []"]
+    copy = ["def _copy_source(data):",
+            "    source = data._source",
+            "    set_data = StorageSet()"]
+    for index, field in enumerate(fields):
+        reader, writer = _STORAGE_METHODS[field.kind]
+        read = "set_data.%s(%r)" % (reader, field.name)
+        copy += ["    if source.contains(%r):" % field.name,
+                 "        set_data.%s(%r, source.%s(%r))" % (writer, field.name, reader, field.name)]
+        load += ["    if contains(%r):" % field.name,
+                 "        data._%s = %s" % (field.name, "intern(%s)" % read if field.name in interned else read),
+                 "    else:",
+                 "        data._%s = DEFAULTS[%d]" % (field.name, index)]
+        write = "set_data.%s(%r, values[%d])" % (writer, field.name, index)
+        sparse += ["    if values[%d] != %r:" % (index, field.default),
+                   "        " + write]
+        full.append("    " + write)
+        line = 'me.get_type_data("%s").%s = %s' % (cls.__item_type__, field.name,
+                                                   _PROTO_FORMATS[field.kind])
+        proto += ["    value = data.%s" % field.name,
+                  "    if value != %r:" % field.default,
+                  "        lines.append(%r %% value)" % line]
+    names = list(cls._FIELD_INDEX)
+    for set_index, source_index in cls._PARSED_FROM.items():
+        load.append("    data._%s = parse_properties(data._%s)" % (names[set_index], names[source_index]))
+    load.append("    data._values = None")
+    sparse.append("    return set_data")
+    full.append("    return set_data")
+    copy.append("    return set_data")
+    proto.append('    return "\\n".join(lines) + ("\\n" if lines else "")')
+    
+    namespace = {"DEFAULTS": cls._DEFAULTS, "StorageSet": storage.StorageSet,
+                 "intern": gear_config.intern_value, "parse_properties": parse_properties}
+    for lines in (load, sparse, full, proto, copy):
+        name = lines[0][4:lines[0].index("(")]
+        exec(compile("\n".join(lines), "<%s.%s>" % (cls.__name__, name), "exec"), namespace)
+        setattr(cls, name, namespace[name])
+
+def _field_getter(index, slot):
+    get_slot = slot.__get__
+    def get_field(self):
+        values = self._values
+        if values is None:
+            return get_slot(self)
+        value = values[index]
+        if value is _UNDECODED:
+            value = _decode_field(self, index)
+        return value
+    return get_field
+
+def _decode_field(data, index):
+    """Read one undecoded value from data's source set into its values"""
+    cls = type(data)
+    values = data._values
+    if type(values) is tuple:
+        values = data._values = list(values)
+    source_index = cls._PARSED_FROM.get(index)
+    if source_index is not None:
+        text = values[source_index]
+        if text is _UNDECODED:
+            text = _decode_field(data, source_index)
+        value = parse_properties(text) if type(text) is str else frozenset()
+    else:
+        name, kind, default = cls._FIELDS[index][:3]
+        source = data._source
+        if source.contains(name):
+            value = getattr(source, _STORAGE_METHODS[kind][0])(name)
+            if index in cls._INTERNED:
+                value = gear_config.intern_value(value)
+        else:
+            value = default
+    values[index] = value
+    return value
+
+def _decode_all(data):
+    """Decode every remaining field and let go of the source set"""
+    for index, value in enumerate(data._values):
+        if value is _UNDECODED:
+            _decode_field(data, index)
+    data._source = None
+
+def _own_values(data):
+    """Move shared or lazily loaded values into data's own field slots"""
+    if data._source is not None:
+        _decode_all(data)
+    for slot, value in zip(type(data)._SLOTS, data._values):
+        slot.__set__(data, value)
+    data._values = None
+
+def _field_setter(name, slot, intern):
+    set_slot = slot.__set__
+    def set_field(self, value):
+        if self._values is not None:
+            # First write to shared values: take them into our own slots
+            _own_values(self)
+        set_slot(self, gear_config.intern_value(value) if intern else value)
+        listener = self._listener
+        if listener is not None:
+            listener(self, name, value)
+    return set_field
+
+def _parsed_setter(name, slot, set_slot):
+    def set_field(self, value):
+        if self._values is not None:
+            _own_values(self)
+        value = gear_config.intern_value(value)
+        slot.__set__(self, value)
+        set_slot.__set__(self, parse_properties(value) if type(value) is str else frozenset())
+        listener = self._listener
+        if listener is not None:
+            listener(self, name, value)
+    return set_field
+
+def set_field_listener(cls, listener):
+    """Set the function told about field writes on instances of cls
+    
+    listener(data, name, value) runs after every field setter, and
+    listener(data, None, None) after copy_values() replaces all of data's
+    values at once. None removes it.
+    """
+    cls._listener = staticmethod(listener) if listener is not None else None
+
+def share_values(data):
+    """Return data's values as a tuple that copies can share
+    
+    Owned values are frozen into a tuple first, so data itself also goes
+    back to copy-on-write; its next write takes them into its slots again.
+    """
+    values = data._values
+    if values is None:
+        values = data._values = tuple(slot.__get__(data) for slot in type(data)._SLOTS)
+    elif type(values) is not tuple:
+        values = data._values = tuple(values)
+    return values
+
+def copy_values(data, other):
+    """Make other share data's values, as copy_to() does
+    
+    A lazily loaded data is decoded first, so the copy never reads from or
+    stores its source set.
+    """
+    if data._source is not None:
+        _decode_all(data)
+    other._values = share_values(data)
+    other._source = None
+    listener = other._listener
+    if listener is not None:
+        listener(other, None, None)
+
+def load_fields(data, set_data):
+    """Read the fields present in set_data onto data; the rest are defaults
+    
+    With LAZY_LOADING nothing is read yet; data just remembers set_data.
+    """
+    if LAZY_LOADING:
+        data._source = set_data
+        data._values = type(data)._UNDECODED_VALUES
+        return
+    data._load_fields(set_data)
+
+def store_fields(data, sparse=None):
+    """Return a StorageSet of data's fields
+    
+    With sparse (SPARSE_STORAGE when None), fields equal to their default
+    are left out; load_fields() reads them back as that default. Lazily
+    loaded data that was never written returns a new set holding the
+    source's keys as stored, without decoding them onto data; the source
+    itself is never handed out, as the caller owns and closes the result.
+    """
+    if data._source is not None:
+        return data._copy_source()
+    if sparse is None:
+        sparse = SPARSE_STORAGE
+    return data._store_sparse() if sparse else data._store_full()
+
+def to_proto(data):
+    """Prototype script lines setting every non-default field of data"""
+    return data._to_proto()
+
+def parse_field(data, name, text):
+    """Set a field of data from OLC input, as its schema entry allows
+    
+    Runs the field's validator, or converts by storage kind, then checks
+    its range. Raises ValueError on bad input; its message, if any, is
+    meant for the builder.
+    """
+    cls = type(data)
+    field = cls._FIELDS[cls._FIELD_INDEX[name]]
+    if field.validator is not None:
+        value = field.validator(text)
+    else:
+        try:
+            value = _INPUT_TYPES[field.kind](text)
+        except ValueError:
+            raise ValueError()
+    if field.range is not None:
+        low, high = (getattr(data, bound) if isinstance(bound, str) else bound
+                     for bound in field.range)
+        if not low <= value <= high:
+            raise ValueError()
+    setattr(data, name, value)
+    return value
+
+def config_choice(is_valid, get_valid, message, other_section=None):
+    """Validator for one configured name, e.g. a damage type
+    
+    message takes the valid names. With other_section, a material that is
+    only configured there is called out before the message.
+    """
+    def validate(text):
+        value = text.strip().lower()
+        if is_valid(value):
+            return value
+        error = message % ", ".join(get_valid())
+        if other_section and other_section + ".materials" in gear_config.get_material_categories(value):
+            article = "an" if other_section[0] in "aeiou" else "a"
+            error = "'%s' is only configured as %s %s material.\n%s" % (value, article, other_section, error)
+        raise ValueError(error)
+    return validate
+
+def config_list(is_valid, get_valid, message):
+    """Validator for a comma-separated list of configured names
+    
+    message takes the invalid names, then the valid ones.
+    """
+    def validate(text):
+        names = [name.strip().lower() for name in text.split(',') if name.strip()]
+        invalid = [name for name in names if not is_valid(name)]
+        if invalid:
+            raise ValueError(message % (", ".join(invalid), ", ".join(get_valid())))
+        return ", ".join(names)
+    return validate
\ No newline at end of file
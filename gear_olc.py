@@ -2,11 +2,14 @@
 gear_olc.py
 
 OLC (Online Creation) editors for gear item types.
-Provides editing interfaces for equipped and wielded item data.
+Provides editing interfaces for equipped and wielded item data. Input is
+parsed and validated, and prototype code written, from the field schemas
+in wielded.py and equipped.py.
 """
 import mudsys
 import olc
 from . import gear_config
+from .gear_data import parse_field, to_proto
 
 # Equipped item OLC menu choices
 EQUIPPED_ARMOR_CLASS = 1
@@ -105,104 +108,53 @@ def equipped_chooser(sock, data, option):
     else:
         return olc.MENU_CHOICE_INVALID
 
-def equipped_parser(sock, data, choice, arg):
-    """Parse equipped item input"""
-    if choice == EQUIPPED_ARMOR_CLASS:
-        try:
-            value = int(arg)
-            if 0 <= value <= 50:
-                data.armor_class = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == EQUIPPED_ENCHANTMENT:
-        try:
-            value = int(arg)
-            if -10 <= value <= 10:
-                data.enchantment_level = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == EQUIPPED_DURABILITY:
-        try:
-            value = int(arg)
-            if 0 <= value <= data.max_durability:
-                data.durability = value
-                return True
-        except ValueError:
-            pass
+# Field edited by each equipped input choice
+EQUIPPED_CHOICE_FIELDS = {
+    EQUIPPED_ARMOR_CLASS: "armor_class",
+    EQUIPPED_ENCHANTMENT: "enchantment_level",
+    EQUIPPED_DURABILITY: "durability",
+    EQUIPPED_MAX_DURABILITY: "max_durability",
+    EQUIPPED_MATERIAL: "material",
+    EQUIPPED_PROPERTIES: "special_properties",
+    EQUIPPED_WORN_TYPE: "worn_type",
+}
+
+def _clamp_durability(data):
+    """Ensure current durability doesn't exceed max"""
+    data.durability = min(data.durability, data.max_durability)
+
+def _clear_ranged_type(data):
+    """Clear ranged type if switching away from ranged"""
+    if data.weapon_category != "ranged":
+        data.ranged_type = ""
+
+# Field -> fixup run after it is set through OLC
+_AFTER_SET = {
+    "max_durability": _clamp_durability,
+    "weapon_category": _clear_ranged_type,
+}
+
+def _parse_choice(sock, data, name, arg):
+    """Set field name from OLC input as its schema allows, see gear_data.parse_field()"""
+    if name is None:
         return False
-    
-    elif choice == EQUIPPED_MAX_DURABILITY:
-        try:
-            value = int(arg)
-            if 1 <= value <= 1000:
-                data.max_durability = value
-                # Ensure current durability doesn't exceed max
-                data.durability = min(data.durability, data.max_durability)
-                return True
-        except ValueError:
-            pass
+    try:
+        parse_field(data, name, arg)
+    except ValueError as e:
+        if str(e):
+            sock.send_raw("%s\n" % e)
         return False
-    
-    elif choice == EQUIPPED_MATERIAL:
-        material = arg.strip().lower()
-        if gear_config.is_valid_equipped_material(material):
-            data.material = material
-            return True
-        else:
-            valid_materials = gear_config.get_equipped_materials()
-            sock.send_raw("Invalid material. Valid materials are: %s\n" % ", ".join(valid_materials))
-            return False
-    
-    elif choice == EQUIPPED_PROPERTIES:
-        # Validate properties (comma-separated list)
-        properties = [p.strip().lower() for p in arg.split(',') if p.strip()]
-        valid_properties = gear_config.get_equipped_special_properties()
-        invalid_props = [p for p in properties if p not in valid_properties]
-        
-        if invalid_props:
-            sock.send_raw("Invalid properties: %s\nValid properties are: %s\n" % 
-                         (", ".join(invalid_props), ", ".join(valid_properties)))
-            return False
-        else:
-            data.special_properties = ", ".join(properties)
-            return True
-    
-    elif choice == EQUIPPED_WORN_TYPE:
-        worn_type = arg.strip().lower()
-        if gear_config.worn_type_exists(worn_type):
-            data.worn_type = worn_type
-            return True
-        else:
-            valid_worn_types = gear_config.get_worn_types()
-            sock.send_raw("Invalid worn type. Valid worn types are: %s\n" % ", ".join(valid_worn_types))
-            return False
-    
-    return False
+    if name in _AFTER_SET:
+        _AFTER_SET[name](data)
+    return True
+
+def equipped_parser(sock, data, choice, arg):
+    """Parse equipped item input"""
+    return _parse_choice(sock, data, EQUIPPED_CHOICE_FIELDS.get(choice), arg)
 
 def equipped_to_proto(data):
     """Generate prototype code for equipped items"""
-    lines = []
-    if data.armor_class > 0:
-        lines.append("me.get_type_data(\"equipped\").armor_class = %d" % data.armor_class)
-    if data.enchantment_level != 0:
-        lines.append("me.get_type_data(\"equipped\").enchantment_level = %d" % data.enchantment_level)
-    if data.durability != 100:
-        lines.append("me.get_type_data(\"equipped\").durability = %d" % data.durability)
-    if data.max_durability != 100:
-        lines.append("me.get_type_data(\"equipped\").max_durability = %d" % data.max_durability)
-    if data.material:
-        lines.append("me.get_type_data(\"equipped\").material = \"%s\"" % data.material)
-    if data.special_properties:
-        lines.append("me.get_type_data(\"equipped\").special_properties = \"%s\"" % data.special_properties)
-    if data.worn_type:
-        lines.append("me.get_type_data(\"equipped\").worn_type = \"%s\"" % data.worn_type)
-    return "\n".join(lines) + ("\n" if lines else "")
+    return to_proto(data)
 
 # Wielded item OLC menu choices
 WIELDED_DAMAGE_TYPE = 1
@@ -317,181 +269,30 @@ def wielded_chooser(sock, data, option):
     else:
         return olc.MENU_CHOICE_INVALID
 
+# Field edited by each wielded input choice
+WIELDED_CHOICE_FIELDS = {
+    WIELDED_DAMAGE_TYPE: "damage_type",
+    WIELDED_WEAPON_CATEGORY: "weapon_category",
+    WIELDED_RANGED_TYPE: "ranged_type",
+    WIELDED_DAMAGE_DICE: "damage_dice",
+    WIELDED_DAMAGE_BONUS: "damage_bonus",
+    WIELDED_HIT_BONUS: "hit_bonus",
+    WIELDED_WEAPON_SPEED: "weapon_speed",
+    WIELDED_REACH: "reach",
+    WIELDED_DURABILITY: "durability",
+    WIELDED_MAX_DURABILITY: "max_durability",
+    WIELDED_MATERIAL: "material",
+    WIELDED_SPECIAL_PROPERTIES: "special_properties",
+    WIELDED_SPECIAL_ATTACKS: "special_attacks",
+}
+
 def wielded_parser(sock, data, choice, arg):
     """Parse wielded item input"""
-    if choice == WIELDED_DAMAGE_TYPE:
-        damage_type = arg.strip().lower()
-        if gear_config.is_valid_damage_type(damage_type):
-            data.damage_type = damage_type
-            return True
-        else:
-            valid_types = gear_config.get_damage_types()
-            sock.send_raw("Invalid damage type. Valid types are: %s\n" % ", ".join(valid_types))
-            return False
-    
-    elif choice == WIELDED_WEAPON_CATEGORY:
-        category = arg.strip().lower()
-        if gear_config.is_valid_weapon_category(category):
-            data.weapon_category = category
-            # Clear ranged type if switching away from ranged
-            if category != "ranged":
-                data.ranged_type = ""
-            return True
-        else:
-            valid_categories = gear_config.get_weapon_categories()
-            sock.send_raw("Invalid weapon category. Valid categories are: %s\n" % ", ".join(valid_categories))
-            return False
-    
-    elif choice == WIELDED_RANGED_TYPE:
-        ranged_type = arg.strip().lower()
-        if gear_config.is_valid_ranged_type(ranged_type):
-            data.ranged_type = ranged_type
-            return True
-        else:
-            valid_types = gear_config.get_ranged_types()
-            sock.send_raw("Invalid ranged type. Valid types are: %s\n" % ", ".join(valid_types))
-            return False
-    
-    elif choice == WIELDED_DAMAGE_DICE:
-        # Basic validation for dice notation
-        arg = arg.strip()
-        if arg and ('d' in arg.lower() or arg.isdigit()):
-            data.damage_dice = arg
-            return True
-        return False
-    
-    elif choice == WIELDED_DAMAGE_BONUS:
-        try:
-            value = int(arg)
-            if -10 <= value <= 20:
-                data.damage_bonus = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_HIT_BONUS:
-        try:
-            value = int(arg)
-            if -10 <= value <= 20:
-                data.hit_bonus = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_WEAPON_SPEED:
-        try:
-            value = float(arg)
-            if 0.1 <= value <= 5.0:
-                data.weapon_speed = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_REACH:
-        try:
-            value = int(arg)
-            if 1 <= value <= 10:
-                data.reach = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_DURABILITY:
-        try:
-            value = int(arg)
-            if 0 <= value <= data.max_durability:
-                data.durability = value
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_MAX_DURABILITY:
-        try:
-            value = int(arg)
-            if 1 <= value <= 1000:
-                data.max_durability = value
-                # Ensure current durability doesn't exceed max
-                data.durability = min(data.durability, data.max_durability)
-                return True
-        except ValueError:
-            pass
-        return False
-    
-    elif choice == WIELDED_MATERIAL:
-        material = arg.strip().lower()
-        if gear_config.is_valid_wielded_material(material):
-            data.material = material
-            return True
-        else:
-            valid_materials = gear_config.get_wielded_materials()
-            sock.send_raw("Invalid material. Valid materials are: %s\n" % ", ".join(valid_materials))
-            return False
-    
-    elif choice == WIELDED_SPECIAL_PROPERTIES:
-        # Validate special properties (comma-separated list)
-        properties = [p.strip().lower() for p in arg.split(',') if p.strip()]
-        valid_properties = gear_config.get_wielded_special_properties()
-        invalid_properties = [p for p in properties if p not in valid_properties]
-        
-        if invalid_properties:
-            sock.send_raw("Invalid properties: %s\nValid properties are: %s\n" % 
-                         (", ".join(invalid_properties), ", ".join(valid_properties)))
-            return False
-        else:
-            data.special_properties = ", ".join(properties)
-            return True
-    
-    elif choice == WIELDED_SPECIAL_ATTACKS:
-        # Validate special attacks (comma-separated list)
-        attacks = [a.strip().lower() for a in arg.split(',') if a.strip()]
-        valid_attacks = gear_config.get_wielded_special_attacks()
-        invalid_attacks = [a for a in attacks if a not in valid_attacks]
-        
-        if invalid_attacks:
-            sock.send_raw("Invalid attacks: %s\nValid attacks are: %s\n" % 
-                         (", ".join(invalid_attacks), ", ".join(valid_attacks)))
-            return False
-        else:
-            data.special_attacks = ", ".join(attacks)
-            return True
-    
-    return False
+    return _parse_choice(sock, data, WIELDED_CHOICE_FIELDS.get(choice), arg)
 
 def wielded_to_proto(data):
     """Generate prototype code for wielded items"""
-    lines = []
-    if data.damage_type != "slashing":
-        lines.append("me.get_type_data(\"wielded\").damage_type = \"%s\"" % data.damage_type)
-    if data.weapon_category != "melee":
-        lines.append("me.get_type_data(\"wielded\").weapon_category = \"%s\"" % data.weapon_category)
-    if data.ranged_type:
-        lines.append("me.get_type_data(\"wielded\").ranged_type = \"%s\"" % data.ranged_type)
-    if data.damage_dice != "1d6":
-        lines.append("me.get_type_data(\"wielded\").damage_dice = \"%s\"" % data.damage_dice)
-    if data.damage_bonus != 0:
-        lines.append("me.get_type_data(\"wielded\").damage_bonus = %d" % data.damage_bonus)
-    if data.hit_bonus != 0:
-        lines.append("me.get_type_data(\"wielded\").hit_bonus = %d" % data.hit_bonus)
-    if data.weapon_speed != 1.0:
-        lines.append("me.get_type_data(\"wielded\").weapon_speed = %.1f" % data.weapon_speed)
-    if data.reach != 1:
-        lines.append("me.get_type_data(\"wielded\").reach = %d" % data.reach)
-    if data.durability != 100:
-        lines.append("me.get_type_data(\"wielded\").durability = %d" % data.durability)
-    if data.max_durability != 100:
-        lines.append("me.get_type_data(\"wielded\").max_durability = %d" % data.max_durability)
-    if data.material != "steel":
-        lines.append("me.get_type_data(\"wielded\").material = \"%s\"" % data.material)
-    if data.special_properties:
-        lines.append("me.get_type_data(\"wielded\").special_properties = \"%s\"" % data.special_properties)
-    if data.special_attacks:
-        lines.append("me.get_type_data(\"wielded\").special_attacks = \"%s\"" % data.special_attacks)
-    return "\n".join(lines) + ("\n" if lines else "")
+    return to_proto(data)
 
 def init_gear_olc():
     """Initialize OLC editors for gear item types"""
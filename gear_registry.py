@@ -0,0 +1,253 @@
+"""
+gear_registry.py
+
+Columnar mirror of the numeric fields of every wielded and equipped item in
+the game, for world-wide questions ("every weapon under 20% durability",
+"total AC of these items") without visiting each object. Each item kind
+keeps one array.array per field and one row per item, keyed by object uid.
+
+Rows are added by the obj_to_game hook and dropped by obj_from_game, and
+kept current by the data classes' field setters through
+gear_data.set_field_listener(). Queries are vectorized with NumPy views
+over the arrays when it is installed and run as plain loops otherwise.
+"""
+import array
+import operator
+import hooks
+from . import gear_data
+from .wielded import WieldedData
+from .equipped import EquippedData
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# kind -> (data class, ((field, array typecode), ...))
+REGISTRY_COLUMNS = {
+    "wielded": (WieldedData, (
+        ("durability", "l"),
+        ("max_durability", "l"),
+        ("hit_bonus", "l"),
+        ("damage_bonus", "l"),
+        ("weapon_speed", "d"),
+        ("reach", "l"),
+    )),
+    "equipped": (EquippedData, (
+        ("durability", "l"),
+        ("max_durability", "l"),
+        ("armor_class", "l"),
+        ("enchantment_level", "l"),
+    )),
+}
+
+# Derived column: durability as a percentage of max_durability
+DURABILITY_PERCENT = "durability_pct"
+
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+class GearColumns:
+    """Numeric fields of one item kind, one array.array per field
+    
+    Rows are dense: removing an item moves the last row into its place, so
+    row numbers are not stable and callers work with uids. The arrays are
+    only resized by add() and remove(); queries take NumPy views of them
+    that never outlive the call.
+    """
+    def __init__(self, kind, columns, use_numpy=True):
+        self.kind = kind
+        self.vectorized = use_numpy and numpy is not None
+        self.columns = {name: array.array(code) for name, code in columns}
+        self._convert = {name: float if code == "d" else int for name, code in columns}
+        self.uids = []
+        self.data = []
+        self.objs = []
+        self._rows = {}       # uid -> row
+        self._data_rows = {}  # id(data) -> row
+    
+    def __len__(self):
+        return len(self.uids)
+    
+    def __contains__(self, uid):
+        return uid in self._rows
+    
+    def add(self, uid, data, obj=None):
+        """Add or refresh the row for uid from data, optionally its object"""
+        row = self._rows.get(uid)
+        if row is not None:
+            old = self.data[row]
+            if old is not data:
+                del self._data_rows[id(old)]
+                self.data[row] = data
+                self._data_rows[id(data)] = row
+            self.objs[row] = obj
+            self._fill(row, data)
+            return
+        self._rows[uid] = len(self.uids)
+        self._data_rows[id(data)] = len(self.uids)
+        self.uids.append(uid)
+        self.data.append(data)
+        self.objs.append(obj)
+        for name, column in self.columns.items():
+            column.append(self._convert[name](getattr(data, name)))
+    
+    def remove(self, uid):
+        """Drop the row for uid, returns whether there was one"""
+        row = self._rows.pop(uid, None)
+        if row is None:
+            return False
+        del self._data_rows[id(self.data[row])]
+        last = len(self.uids) - 1
+        if row != last:
+            # Fill the hole with the last row instead of shifting every row
+            moved_uid = self.uids[last]
+            moved = self.data[last]
+            self.uids[row] = moved_uid
+            self.data[row] = moved
+            self.objs[row] = self.objs[last]
+            self._rows[moved_uid] = row
+            self._data_rows[id(moved)] = row
+            for column in self.columns.values():
+                column[row] = column[last]
+        self.uids.pop()
+        self.data.pop()
+        self.objs.pop()
+        for column in self.columns.values():
+            column.pop()
+        return True
+    
+    def _fill(self, row, data):
+        for name, column in self.columns.items():
+            column[row] = self._convert[name](getattr(data, name))
+    
+    def on_write(self, data, name, value):
+        """Field listener: mirror a write to registered data"""
+        row = self._data_rows.get(id(data))
+        if row is None:
+            return
+        if name is None:
+            self._fill(row, data)
+        elif name in self.columns:
+            self.columns[name][row] = self._convert[name](value)
+    
+    def get(self, uid, name):
+        """Mirrored value of one field for uid, or None if not registered"""
+        row = self._rows.get(uid)
+        return None if row is None else self.columns[name][row]
+    
+    def get_data(self, uid):
+        """The registered data object for uid, or None"""
+        row = self._rows.get(uid)
+        return None if row is None else self.data[row]
+    
+    def get_obj(self, uid):
+        """The object registered for uid, or None"""
+        row = self._rows.get(uid)
+        return None if row is None else self.objs[row]
+    
+    def _vector(self, name):
+        """NumPy array of a column or of DURABILITY_PERCENT"""
+        if name != DURABILITY_PERCENT:
+            column = self.columns[name]
+            return numpy.frombuffer(column, dtype=column.typecode) if len(column) else numpy.zeros(0)
+        durability = self._vector("durability")
+        maximum = self._vector("max_durability")
+        # Items without a max durability count as undamaged
+        return numpy.where(maximum > 0, durability * 100.0 / numpy.maximum(maximum, 1), 100.0)
+    
+    def _values(self, name):
+        """Sequence of a column or of DURABILITY_PERCENT"""
+        if name != DURABILITY_PERCENT:
+            return self.columns[name]
+        return [durability * 100.0 / maximum if maximum > 0 else 100.0
+                for durability, maximum in zip(self.columns["durability"],
+                                               self.columns["max_durability"])]
+    
+    def select(self, *conditions):
+        """uids of every row matching all (field, op, value) conditions
+        
+        field is a column name or DURABILITY_PERCENT, op one of <, <=, >,
+        >=, == and !=. E.g. select(("durability_pct", "<", 20)). Raises
+        ValueError for an unknown field or operator.
+        """
+        for name, op, _value in conditions:
+            if name != DURABILITY_PERCENT and name not in self.columns:
+                raise ValueError("no %s column named '%s'" % (self.kind, name))
+            if op not in _OPERATORS:
+                raise ValueError("unknown operator '%s'" % op)
+        if self.vectorized:
+            keep = numpy.ones(len(self.uids), dtype=bool)
+            for name, op, value in conditions:
+                keep &= _OPERATORS[op](self._vector(name), value)
+            return [self.uids[row] for row in numpy.flatnonzero(keep).tolist()]
+        rows = range(len(self.uids))
+        for name, op, value in conditions:
+            test = _OPERATORS[op]
+            values = self._values(name)
+            rows = [row for row in rows if test(values[row], value)]
+        return [self.uids[row] for row in rows]
+    
+    def total(self, name, uids=None):
+        """Sum of one column over uids (every row when None)
+        
+        uids that are not registered are skipped.
+        """
+        if name not in self.columns:
+            raise ValueError("no %s column named '%s'" % (self.kind, name))
+        column = self.columns[name]
+        if uids is None:
+            if self.vectorized:
+                return self._vector(name).sum().item()
+            return sum(column)
+        rows = [self._rows[uid] for uid in uids if uid in self._rows]
+        if self.vectorized:
+            return self._vector(name)[rows].sum().item() if rows else 0
+        return sum(column[row] for row in rows)
+
+# kind -> GearColumns of every item of that kind in the game
+_registries = {kind: GearColumns(kind, columns)
+               for kind, (_cls, columns) in REGISTRY_COLUMNS.items()}
+
+def _listener(registry):
+    def on_write(data, name, value):
+        registry.on_write(data, name, value)
+    return on_write
+
+for _kind, (_cls, _columns) in REGISTRY_COLUMNS.items():
+    gear_data.set_field_listener(_cls, _listener(_registries[_kind]))
+
+def get_gear_registry(kind):
+    """The GearColumns registry for 'wielded' or 'equipped' items"""
+    if kind not in _registries:
+        raise ValueError("no gear registry for '%s'" % kind)
+    return _registries[kind]
+
+def get_registry_stats():
+    """Row count and backend of each registry"""
+    return {kind: {'rows': len(registry), 'vectorized': registry.vectorized}
+            for kind, registry in _registries.items()}
+
+def registry_obj_to_game_hook(info):
+    """Hook adding a wielded or equipped object entering the game"""
+    obj, = hooks.parse_info(info)
+    for kind, registry in _registries.items():
+        if obj.istype(kind):
+            data = obj.get_type_data(kind)
+            if data:
+                registry.add(obj.uid, data, obj)
+
+def registry_obj_from_game_hook(info):
+    """Hook dropping an object leaving the game"""
+    obj, = hooks.parse_info(info)
+    for registry in _registries.values():
+        registry.remove(obj.uid)
+
+hooks.add("obj_to_game", registry_obj_to_game_hook)
+hooks.add("obj_from_game", registry_obj_from_game_hook)
@@ -0,0 +1,76 @@
+"""
+gear_stats.py
+
+Admin view of gear config instrumentation. Reports how often and how long
+the config has been loaded, saved, reloaded and registered with C, how many
+bytes those saves wrote and how large each category is, from
+gear_config.get_gear_config_stats(), along with the in-game gear registry
+and durability wear counters.
+"""
+from . import gear_config, gear_registry, gear_wear
+
+def _format_operations(stats):
+    """Report lines for the timed config operations"""
+    lines = ["{g%-10s %7s %6s %10s %10s %10s{n" % (
+        "operation", "calls", "errors", "mean ms", "last ms", "max ms")]
+    for name, op in stats['operations'].items():
+        lines.append("%-10s %7d %6d %10.2f %10.2f %10.2f" % (
+            name, op['calls'], op['errors'], op['mean'] * 1000,
+            op['last'] * 1000, op['max'] * 1000))
+    return lines
+
+def _format_saves(stats):
+    """Report lines for save scheduling and bytes written"""
+    save = stats['save']
+    written = stats['bytes_written']
+    return [
+        "Save requests: %d, writes: %d, coalesced: %d, pending: %s" % (
+            save['requests'], save['writes'], save['coalesced'], save['pending']),
+        "Bytes written: config %d, cache %d, journal %d" % (
+            written['config'], written['cache'], written['journal']),
+        "Journal: %d appended, %d replayed, %d compactions, %d bytes" % (
+            stats['journal']['appended'], stats['journal']['replayed'],
+            stats['journal']['compactions'], stats['journal']['size']),
+    ]
+
+def _format_items(stats):
+    """Report lines for the size of every category"""
+    lines = ["{gItems per category:{n"]
+    for path, count in stats['items'].items():
+        lines.append("  %-32s %6d" % (path, count))
+    return lines
+
+def _format_gear():
+    """Report lines for the in-game gear registry and wear engine"""
+    rows = gear_registry.get_registry_stats()
+    wear = gear_wear.get_wear_stats()
+    return [
+        "Registry rows: wielded %d, equipped %d" % (
+            rows['wielded']['rows'], rows['equipped']['rows']),
+        "Wear: %d queued, %d applied in %d passes, %d condition changes, %d pending" % (
+            wear['queued'], wear['applied'], wear['passes'],
+            wear['condition_changes'], wear['pending']),
+    ]
+
+def cmd_gearstats(ch, cmd, arg):
+    """
+    Syntax: gearstats [boot]
+    
+    Shows call counts, timings and bytes written for gear config loading,
+    saving, reloading and worn type registration, plus the number of items
+    in each category, registry and wear engine counters. With 'boot', shows
+    the gear module boot breakdown.
+    """
+    if arg.strip().lower() == "boot":
+        from . import get_import_report
+        for stage, seconds in get_import_report():
+            ch.send("  %-40s %8.2f ms" % (stage, seconds * 1000))
+        return
+    
+    stats = gear_config.get_gear_config_stats()
+    if not stats['initialized']:
+        ch.send("The gear config has not been loaded yet.")
+        return
+    for line in (_format_operations(stats) + _format_saves(stats) +
+                 _format_gear() + _format_items(stats)):
+        ch.send(line)
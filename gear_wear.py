@@ -0,0 +1,178 @@
+"""
+gear_wear.py
+
+Durability wear for wielded and equipped items. Combat code reports hits
+and blocks with queue_hit_wear()/queue_block_wear() (or queue_wear() for a
+specific item); that only adds to a per-item total. Once per pulse the
+queued wear is applied in one pass, clamped to 0..max_durability like the
+durability setters, and every character whose gear changed condition gets
+one "gear_condition_changed" hook for all of it. Worn gear also decays by
+DECAY_AMOUNT every DECAY_INTERVAL seconds.
+"""
+import hooks, event
+from . import gear_registry
+from .gear_data import durability_condition
+
+# Durability lost per reported hit or block
+HIT_WEAR = 1
+BLOCK_WEAR = 1
+
+# Durability every worn item loses per DECAY_INTERVAL seconds; 0 disables
+DECAY_AMOUNT = 0
+DECAY_INTERVAL = 60.0
+
+# Seconds between wear passes: one pulse, so a combat round lands together
+WEAR_DISPATCH_INTERVAL = 0.1
+
+def _gear_data(obj):
+    """Wielded or equipped data of obj, or None"""
+    for kind in ("wielded", "equipped"):
+        if obj.istype(kind):
+            return obj.get_type_data(kind)
+    return None
+
+class WearEngine:
+    """Queued durability wear, applied in batches
+    
+    queue() adds to a pending total per object; apply() writes every total
+    at once and runs "gear_condition_changed" with info (ch, count) once
+    per character whose items crossed into a different condition. Hook
+    handlers get the details from get_condition_changes(ch).
+    """
+    def __init__(self):
+        self.pending = {}     # obj uid -> [ch, obj, data, amount]
+        self.changes = {}     # ch uid -> [(obj, old condition, new condition)]
+        self.queued = 0
+        self.applied = 0
+        self.passes = 0
+        self.condition_changes = 0
+        self.errors = 0
+        self.last_error = None
+    
+    def queue(self, ch, obj, amount=1):
+        """Queue amount of wear on obj, carried or worn by ch
+        
+        Returns False for objects without durability (not wielded or
+        equipped, or with no max durability) or a non-positive amount.
+        """
+        if amount <= 0:
+            return False
+        data = _gear_data(obj)
+        if not data or data.max_durability <= 0:
+            return False
+        entry = self.pending.get(obj.uid)
+        if entry is None:
+            self.pending[obj.uid] = [ch, obj, data, amount]
+        else:
+            entry[3] += amount
+        self.queued += 1
+        return True
+    
+    def apply(self):
+        """Apply all queued wear, returns the number of items changed"""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, {}
+        changes = {}
+        changed = 0
+        for ch, obj, data, amount in pending.values():
+            maximum = data.max_durability
+            old = data.durability
+            new = max(0, min(old - amount, maximum))
+            if new == old:
+                continue
+            data.durability = new
+            changed += 1
+            if ch is None or maximum <= 0:
+                continue
+            before = durability_condition(old, maximum)
+            after = durability_condition(new, maximum)
+            if before != after:
+                changes.setdefault(ch.uid, (ch, []))[1].append((obj, before, after))
+        self.applied += changed
+        self.passes += 1
+        
+        self.changes = {uid: items for uid, (_ch, items) in changes.items()}
+        for ch, items in changes.values():
+            self.condition_changes += len(items)
+            try:
+                hooks.run("gear_condition_changed", hooks.build_info("ch int", (ch, len(items))))
+            except Exception as e:
+                # One broken handler shouldn't stop the others' notices
+                self.errors += 1
+                self.last_error = str(e)
+        return changed
+    
+    def stats(self):
+        """Return a dict of wear engine counters"""
+        return {'queued': self.queued, 'applied': self.applied, 'passes': self.passes,
+                'pending': len(self.pending), 'condition_changes': self.condition_changes,
+                'errors': self.errors, 'last_error': self.last_error}
+
+_engine = WearEngine()
+
+def queue_wear(ch, obj, amount=1):
+    """Queue wear on one item, see WearEngine.queue()"""
+    return _engine.queue(ch, obj, amount)
+
+def queue_hit_wear(ch, hand='primary', amount=HIT_WEAR):
+    """Queue wear on the weapon ch hit with
+    
+    hand is 'primary' (right hand) or 'offhand' (left hand); a weapon held
+    in both hands counts for either. Returns False if the hand is empty.
+    """
+    target_hand = 'right hand' if hand == 'primary' else 'left hand'
+    for obj in ch.eq:
+        if obj.istype("wielded"):
+            location = ch.get_slots(obj).lower()
+            if target_hand in location:
+                return _engine.queue(ch, obj, amount)
+    return False
+
+def queue_block_wear(ch, bodypart=None, amount=BLOCK_WEAR):
+    """Queue wear on the armor that took a blocked blow
+    
+    Wears every equipped item on bodypart, or all equipped items when
+    bodypart is None. Returns the number of items queued.
+    """
+    queued = 0
+    for obj in ch.eq:
+        if obj.istype("equipped"):
+            if bodypart is None or bodypart.lower() in ch.get_slots(obj).lower():
+                queued += _engine.queue(ch, obj, amount)
+    return queued
+
+def get_condition_changes(ch):
+    """Items of ch that changed condition in the last wear pass
+    
+    Returns a list of (obj, old condition, new condition), e.g. for a
+    "gear_condition_changed" handler to message the character.
+    """
+    return list(_engine.changes.get(ch.uid, ()))
+
+def apply_wear(owner=None, data=None, arg=None):
+    """Apply queued wear now; also runs every pulse"""
+    return _engine.apply()
+
+def decay_worn_gear(owner=None, data=None, arg=None):
+    """Periodic update: queue DECAY_AMOUNT wear on every worn item"""
+    if DECAY_AMOUNT <= 0:
+        return 0
+    queued = 0
+    for kind in ("wielded", "equipped"):
+        registry = gear_registry.get_gear_registry(kind)
+        for uid in registry.select(("durability", ">", 0)):
+            obj = registry.get_obj(uid)
+            wearer = obj.wearer if obj is not None else None
+            if wearer is not None:
+                queued += _engine.queue(wearer, obj, DECAY_AMOUNT)
+    return queued
+
+def get_wear_stats():
+    """Get wear engine counters: queued, applied, passes, pending, errors"""
+    return _engine.stats()
+
+# Apply queued wear once per pulse
+event.start_update(None, WEAR_DISPATCH_INTERVAL, apply_wear)
+# Periodic decay of worn gear
+event.start_update(None, DECAY_INTERVAL, decay_worn_gear)
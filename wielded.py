@@ -5,95 +5,106 @@ Python item subtype for wielded weapons and tools.
 Provides data storage and functionality for weapons, tools, and other wielded items.
 """
 import mudsys, storage, hooks, mud
+from . import gear_config
+from .gear_data import GearField, gear_fields, copy_values, load_fields, store_fields
+from .gear_data import config_choice, config_list, durability_condition, condition_suffix
+from .dice import parse_dice
 
+def _dice_validator(text):
+    """OLC validator normalizing a damage dice expression
+    
+    A flat damage value must be positive, as the OLC always required.
+    """
+    try:
+        dice = parse_dice(text)
+    except ValueError:
+        dice = None
+    if dice is None or (not dice.sides and dice.modifier <= 0):
+        raise ValueError("Invalid dice. Use NdS with an optional modifier, e.g. 1d6 or 2d4+1.")
+    return str(dice)
+
+# Schema of every stored field, in storage order
+WIELDED_FIELDS = (
+    GearField("damage_type", "String", "slashing",
+              validator=config_choice(gear_config.is_valid_damage_type, gear_config.get_damage_types,
+                                      "Invalid damage type. Valid types are: %s")),
+    GearField("weapon_category", "String", "melee",
+              validator=config_choice(gear_config.is_valid_weapon_category,
+                                      gear_config.get_weapon_categories,
+                                      "Invalid weapon category. Valid categories are: %s")),
+    # Only used if weapon_category is "ranged"
+    GearField("ranged_type", "String", "",
+              validator=config_choice(gear_config.is_valid_ranged_type, gear_config.get_ranged_types,
+                                      "Invalid ranged type. Valid types are: %s")),
+    GearField("damage_dice", "String", "1d6", validator=_dice_validator),
+    GearField("damage_bonus", "Int", 0, range=(-10, 20)),
+    GearField("hit_bonus", "Int", 0, range=(-10, 20)),
+    GearField("weapon_speed", "Double", 1.0, range=(0.1, 5.0)),
+    GearField("reach", "Int", 1, range=(1, 10)),
+    GearField("durability", "Int", 100, range=(0, "max_durability")),
+    GearField("max_durability", "Int", 100, range=(1, 1000)),
+    GearField("material", "String", "steel",
+              validator=config_choice(gear_config.is_valid_wielded_material,
+                                      gear_config.get_wielded_materials,
+                                      "Invalid material. Valid materials are: %s", "equipped")),
+    GearField("special_properties", "String", "",
+              validator=config_list(gear_config.is_valid_wielded_special_property,
+                                    gear_config.get_wielded_special_properties,
+                                    "Invalid properties: %s\nValid properties are: %s")),
+    GearField("special_attacks", "String", "",
+              validator=config_list(gear_config.is_valid_wielded_special_attack,
+                                    gear_config.get_wielded_special_attacks,
+                                    "Invalid attacks: %s\nValid attacks are: %s")),
+)
+
+@gear_fields(WIELDED_FIELDS,
+             interned=("damage_type", "weapon_category", "ranged_type", "damage_dice",
+                       "material", "special_attacks"),
+             parsed={"special_properties": "property_set"})
 class WieldedData:
     """
     Data class for wielded items.
     Stores weapon/tool-specific information like damage, weapon type, etc.
+    
+    Field values are a copy-on-write tuple shared with the class defaults
+    or with the data this was copied from, and move into a slot per field
+    on the first write or a load; see gear_data.gear_fields(). String
+    fields are interned on write, and property_set is a frozenset of
+    special_properties kept in step with the string.
     """
     __item_type__ = "wielded"
+    __slots__ = ("_values", "_source",
+                 # Only ever set through the obj.weapon_type setter
+                 "weapon_type")
     
     def __init__(self, set_data=None):
         """Initialize wielded data, optionally from storage set"""
-        self.damage_type = "slashing"
-        self.weapon_category = "melee"
-        self.ranged_type = ""  # Only used if weapon_category is "ranged"
-        self.damage_dice = "1d6"
-        self.damage_bonus = 0
-        self.hit_bonus = 0
-        self.weapon_speed = 1.0
-        self.reach = 1
-        self.durability = 100
-        self.max_durability = 100
-        self.material = "steel"
-        self.special_properties = ""
-        self.special_attacks = ""
+        self._values = self._DEFAULTS
+        self._source = None
         
-        # Load from storage if provided
+        # Load from storage if provided; missing keys keep their defaults
         if set_data:
-            self.damage_type = set_data.readString("damage_type")
-            self.weapon_category = set_data.readString("weapon_category")
-            self.ranged_type = set_data.readString("ranged_type")
-            self.damage_dice = set_data.readString("damage_dice")
-            self.damage_bonus = set_data.readInt("damage_bonus")
-            self.hit_bonus = set_data.readInt("hit_bonus")
-            self.weapon_speed = set_data.readDouble("weapon_speed")
-            self.reach = set_data.readInt("reach")
-            self.durability = set_data.readInt("durability")
-            self.max_durability = set_data.readInt("max_durability")
-            self.material = set_data.readString("material")
-            self.special_properties = set_data.readString("special_properties")
-            self.special_attacks = set_data.readString("special_attacks")
+            load_fields(self, set_data)
+    
+    def has_property(self, prop):
+        """Check for a special property, e.g. 'versatile'"""
+        return prop in self.property_set
     
     def copy(self):
-        """Create a copy of this wielded data"""
+        """Create a copy of this wielded data, sharing values until either is written"""
         new_data = WieldedData()
-        new_data.weapon_type = self.weapon_type
-        new_data.damage_dice = self.damage_dice
-        new_data.damage_bonus = self.damage_bonus
-        new_data.hit_bonus = self.hit_bonus
-        new_data.weapon_speed = self.weapon_speed
-        new_data.reach = self.reach
-        new_data.durability = self.durability
-        new_data.max_durability = self.max_durability
-        new_data.material = self.material
-        new_data.special_properties = self.special_properties
-        new_data.special_attacks = self.special_attacks
+        self.copy_to(new_data)
         return new_data
     
     def copy_to(self, other):
         """Copy this wielded data to another WieldedData object"""
-        other.damage_type = self.damage_type
-        other.weapon_category = self.weapon_category
-        other.ranged_type = self.ranged_type
-        other.damage_dice = self.damage_dice
-        other.damage_bonus = self.damage_bonus
-        other.hit_bonus = self.hit_bonus
-        other.weapon_speed = self.weapon_speed
-        other.reach = self.reach
-        other.durability = self.durability
-        other.max_durability = self.max_durability
-        other.material = self.material
-        other.special_properties = self.special_properties
-        other.special_attacks = self.special_attacks
+        copy_values(self, other)
+        if hasattr(self, "weapon_type"):
+            other.weapon_type = self.weapon_type
     
     def store(self):
-        """Store wielded data to a storage set"""
-        set_data = storage.StorageSet()
-        set_data.storeString("damage_type", self.damage_type)
-        set_data.storeString("weapon_category", self.weapon_category)
-        set_data.storeString("ranged_type", self.ranged_type)
-        set_data.storeString("damage_dice", self.damage_dice)
-        set_data.storeInt("damage_bonus", self.damage_bonus)
-        set_data.storeInt("hit_bonus", self.hit_bonus)
-        set_data.storeDouble("weapon_speed", self.weapon_speed)
-        set_data.storeInt("reach", self.reach)
-        set_data.storeInt("durability", self.durability)
-        set_data.storeInt("max_durability", self.max_durability)
-        set_data.storeString("material", self.material)
-        set_data.storeString("special_properties", self.special_properties)
-        set_data.storeString("special_attacks", self.special_attacks)
-        return set_data
+        """Store wielded data to a storage set, skipping default fields"""
+        return store_fields(self)
 
 def do_wield(ch, obj, where):
     """Handle wielding an object"""
@@ -107,19 +118,16 @@ def do_wield(ch, obj, where):
         ch.send("That item has no wielding data.")
         return
     
-    # Parse special properties
-    properties = [p.strip().lower() for p in data.special_properties.split(',') if p.strip()]
-    
     # Validate wield location based on properties
     if where:
         where = where.lower()
         if where in ["both", "both hands", "two hands"]:
-            if "versatile" not in properties:
+            if not data.has_property("versatile"):
                 ch.send("That weapon cannot be wielded with both hands.")
                 return
             where = "left hand,right hand"
         elif where in ["offhand", "off hand", "left hand"]:
-            if "offhand" not in properties:
+            if not data.has_property("offhand"):
                 ch.send("That weapon cannot be wielded in the offhand.")
                 return
             where = "left hand"
@@ -178,37 +186,21 @@ def cmd_wield(ch, cmd, arg):
 
 def get_durability_condition(durability, max_durability):
     """Get condition description based on durability percentage"""
-    if max_durability <= 0:
-        return "broken"
-    
-    percentage = (durability * 100) // max_durability
-    
-    if percentage >= 95:
-        return "in perfect condition"
-    elif percentage >= 80:
-        return "in excellent condition"
-    elif percentage >= 65:
-        return "in good condition"
-    elif percentage >= 50:
-        return "showing some wear"
-    elif percentage >= 35:
-        return "well worn"
-    elif percentage >= 20:
-        return "badly worn"
-    elif percentage >= 5:
-        return "in poor condition"
-    else:
-        return "nearly broken"
+    return durability_condition(durability, max_durability)
 
 def append_wield_hook(info):
-    """Hook to append durability condition to wielded item descriptions"""
-    obj, = hooks.parse_info(info)
+    """Hook to add durability condition to what a looker sees of a wielded item
+    
+    Appends to the looker's look buffer, leaving obj.desc itself untouched.
+    """
+    obj, ch = hooks.parse_info(info)
     
     if obj.istype("wielded"):
         data = obj.get_type_data("wielded")
-        if data and data.max_durability > 0:
-            condition = get_durability_condition(data.durability, data.max_durability)
-            obj.desc = obj.desc + " It is " + condition + "."
+        if data:
+            suffix = condition_suffix(data)
+            if suffix:
+                ch.look_buf = ch.look_buf + suffix
 
 def cmd_unwield(ch, cmd, arg):
     """Usage: unwield <item>
@@ -292,7 +284,7 @@ def init_wielded():
     mudsys.add_cmd("gear", None, cmd_gear, "player", 1)
     
     # Register hooks
-    hooks.add("append_description", append_wield_hook)
+    hooks.add("preprocess_obj_desc", append_wield_hook)
     
     # Add Python object getters/setters for wielded items
     def get_wielded_weapon_type(obj):